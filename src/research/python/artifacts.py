@@ -0,0 +1,81 @@
+import json
+import os
+import numpy as np
+from dataclasses import asdict
+from typing import Optional
+from engine import SimulationParams, BatchResult, ENGINE_VERSION
+from cache import run_key, stream_key
+
+# Full path-level exports live outside public/data (which the app serves);
+# src/research/python -> ../../../data/research
+ARTIFACT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "../../../data/research")
+
+ARTIFACT_FORMAT = 'depin-mc-paths/1'
+ARTIFACT_DTYPE = np.float32
+
+def artifact_paths(stem: str, directory: str = ARTIFACT_DIR) -> tuple:
+    """(array file, manifest file) of the artifact named stem, e.g. 'research_bear'"""
+    return os.path.join(directory, f"{stem}.paths.npy"), os.path.join(directory, f"{stem}.manifest.json")
+
+def write_artifact(stem: str, params: SimulationParams, results: BatchResult, scenario: Optional[str] = None,
+                   directory: str = ARTIFACT_DIR) -> str:
+    """Write every path of a run as one uncompressed float32 .npy plus a JSON manifest.
+
+    The array keeps BatchResult's (metric, path, week) layout, so
+    load_artifact can memory-map it straight back. Returns the manifest path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    array_path, manifest_path = artifact_paths(stem, directory)
+    first_path = results.origin[1] if results.origin is not None else 0
+
+    data = np.lib.format.open_memmap(f"{array_path}.tmp", mode='w+', dtype=ARTIFACT_DTYPE, shape=results.data.shape)
+    for m in range(len(results.metrics)):
+        data[m] = results.data[m]
+    data.flush()
+    del data
+    os.replace(f"{array_path}.tmp", array_path)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "scenario": scenario,
+        "file": os.path.basename(array_path),
+        "dtype": np.dtype(ARTIFACT_DTYPE).name,
+        "layout": ["metric", "path", "week"],
+        "shape": list(results.data.shape),
+        "metrics": list(results.metrics),
+        "n_sims": results.n_sims,
+        "first_path": first_path,
+        "T": results.T,
+        "engine": ENGINE_VERSION,
+        "run_key": run_key(params, results.n_sims, 'paths', first_path),
+        "params": asdict(params),
+    }
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+def read_manifest(stem: str, directory: str = ARTIFACT_DIR) -> Optional[dict]:
+    try:
+        with open(artifact_paths(stem, directory)[1]) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def artifact_is_current(stem: str, params: SimulationParams, n_sims: int, directory: str = ARTIFACT_DIR) -> bool:
+    """True when the stored artifact holds exactly this run on the current engine"""
+    manifest = read_manifest(stem, directory)
+    return (manifest is not None and manifest.get("run_key") == run_key(params, n_sims, 'paths')
+            and os.path.exists(artifact_paths(stem, directory)[0]))
+
+def load_artifact(stem: str, directory: str = ARTIFACT_DIR, mmap: bool = True) -> BatchResult:
+    """Paths of a written artifact as a BatchResult, memory-mapped read-only by default.
+
+    Values are float32; aggregate_results and the streaming reducers accept
+    the result as-is.
+    """
+    manifest = read_manifest(stem, directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No artifact manifest for {stem!r} in {directory}")
+    data = np.load(artifact_paths(stem, directory)[0], mmap_mode='r' if mmap else None)
+    origin = (stream_key(SimulationParams(**manifest["params"])), manifest.get("first_path", 0))
+    return BatchResult(manifest["n_sims"], manifest["T"], data, metrics=manifest["metrics"], origin=origin)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import numpy as np
+from dataclasses import asdict
+from typing import Dict, Optional, Sequence
+from engine import SimulationParams, BatchResult, ENGINE_VERSION, RESULT_FIELDS
+
+DEFAULT_CACHE_DIR = os.environ.get('DEPIN_MC_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'depin-mc'))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+def run_key(params: SimulationParams, n_sims: int, kind: str, first_path: int = 0, **extra) -> str:
+    """Stable content hash of everything that determines a run's output.
+
+    Seed streams are fully determined by params.seed and the path count
+    (see engine.path_seeds); params.nSims is ignored in favour of n_sims.
+    """
+    fields = asdict(params)
+    fields.pop('nSims')
+    payload = {
+        'kind': kind,
+        'engine': ENGINE_VERSION,
+        'params': fields,
+        'seed_stream': f"SeedSequence({params.seed}).spawn[{first_path}:{first_path + n_sims}]",
+        'n_sims': n_sims,
+        **extra,
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+def stream_key(params: SimulationParams) -> str:
+    """Hash of the params and seed stream a run draws its paths from, whatever its path range"""
+    return run_key(params, 0, 'stream')
+
+def _metrics_key(metrics: Sequence[str]) -> dict:
+    # Full recordings keep their original keys; subsets are keyed by their metrics
+    return {} if tuple(metrics) == RESULT_FIELDS else {'metrics': list(metrics)}
+
+class ResultCache:
+    """On-disk, content-addressed cache of Monte Carlo runs.
+
+    Entries are .npz files named by run_key(): full path arrays for
+    run_monte_carlo, aggregate_results dicts for the exports, or models
+    trained on engine runs. Reads touch
+    the file's mtime and writes evict least-recently-used entries once the
+    directory exceeds max_bytes.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npz")
+
+    def _load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        path = self._path(key)
+        try:
+            with np.load(path) as f:
+                entry = {name: f[name] for name in f.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        return entry
+
+    def _store(self, key: str, arrays: Dict[str, np.ndarray]):
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        # Atomic publish, so concurrent readers never see a partial entry
+        os.replace(tmp, path)
+        self.evict()
+
+    def get_paths(self, params: SimulationParams, n_sims: int, first_path: int = 0,
+                  metrics: Sequence[str] = RESULT_FIELDS, **extra) -> Optional[BatchResult]:
+        entry = self._load(run_key(params, n_sims, 'paths', first_path, **_metrics_key(metrics), **extra))
+        if entry is None or tuple(entry['metrics']) != tuple(metrics):
+            return None
+        return BatchResult(n_sims, params.T, entry['data'], metrics=metrics)
+
+    def put_paths(self, params: SimulationParams, n_sims: int, results: BatchResult, first_path: int = 0, **extra):
+        self._store(run_key(params, n_sims, 'paths', first_path, **_metrics_key(results.metrics), **extra),
+                    {'data': np.asarray(results.data), 'metrics': np.array(results.metrics)})
+
+    def get_aggregate(self, params: SimulationParams, n_sims: int, **extra) -> Optional[Dict[str, Dict[str, np.ndarray]]]:
+        entry = self._load(run_key(params, n_sims, 'aggregate', **extra))
+        if entry is None:
+            return None
+        agg = {}
+        for name, values in entry.items():
+            series, stat = name.split('/')
+            agg.setdefault(series, {})[stat] = values
+        return agg
+
+    def put_aggregate(self, params: SimulationParams, n_sims: int, agg: Dict[str, Dict[str, np.ndarray]], **extra):
+        self._store(run_key(params, n_sims, 'aggregate', **extra),
+                    {f"{series}/{stat}": values for series, stats in agg.items() for stat, values in stats.items()})
+
+    def get_model(self, params: SimulationParams, n_sims: int, **extra) -> Optional[Dict[str, np.ndarray]]:
+        """Arrays of a model trained on runs of params (e.g. surrogate.Surrogate), or None"""
+        return self._load(run_key(params, n_sims, 'model', **extra))
+
+    def put_model(self, params: SimulationParams, n_sims: int, arrays: Dict[str, np.ndarray], **extra):
+        self._store(run_key(params, n_sims, 'model', **extra), arrays)
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.npz'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.root, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,140 @@
+import time
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool, cpu_count
+from dataclasses import dataclass, replace
+from scipy.optimize import minimize
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+from engine import SimulationParams, path_seeds, draw_random_block, RESULT_FIELDS
+from sensitivity import default_bounds, sample_design
+from sweep import STRUCTURAL_FIELDS, simulate_points
+
+# Behavioural coefficients fitted by default
+CALIBRATION_FIELDS = ('kDemandPrice', 'kMintPrice', 'churnThreshold', 'providerCostPerWeek')
+
+def trajectory_loss(simulated: Mapping[str, np.ndarray], observed: Mapping[str, np.ndarray],
+                    weights: Optional[Mapping[str, float]] = None) -> np.ndarray:
+    """Weighted mean squared log error between simulated and observed series.
+
+    simulated: {series: (k, T_obs)} path-mean trajectories of k candidates.
+    observed: {series: (T_obs,)}; NaN weeks are skipped. Log errors make
+    price and node counts comparable without rescaling. Returns (k,) losses.
+    """
+    loss = 0.0
+    for name, obs in observed.items():
+        obs = np.asarray(obs, dtype=float)
+        seen = ~np.isnan(obs)
+        err = np.log(np.maximum(simulated[name][:, seen], 1e-12)) - np.log(obs[seen])
+        loss = loss + (weights or {}).get(name, 1.0) * (err ** 2).mean(axis=1)
+    return loss
+
+# Per-worker state, set once by the pool initializer
+_worker = {}
+
+def _init_calibration_worker(base_params: SimulationParams, names: Tuple[str, ...], lower: np.ndarray, upper: np.ndarray,
+                             observed: Dict[str, np.ndarray], weights: Optional[Dict[str, float]], noise: np.ndarray,
+                             step: float, maxiter: int):
+    """Pool initializer for calibrate: the problem and its fixed noise block, sent once"""
+    _worker.update(base_params=base_params, names=names, lower=lower, upper=upper, observed=observed,
+                   weights=weights, noise=noise, step=step, maxiter=maxiter)
+
+def _evaluate(u: np.ndarray) -> np.ndarray:
+    # u: (k, d) candidates in unit coordinates -> (k,) losses, all k in one batch
+    values = _worker['lower'] + u * (_worker['upper'] - _worker['lower'])
+    observed = _worker['observed']
+    data = simulate_points(_worker['base_params'], dict(zip(_worker['names'], values.T)), _worker['noise'], list(observed))
+    means = data.mean(axis=2)
+    simulated = {name: m[:, :len(observed[name])] for name, m in zip(observed, means)}
+    return trajectory_loss(simulated, observed, _worker['weights'])
+
+def _loss_and_gradient(u: np.ndarray) -> Tuple[float, np.ndarray]:
+    # Central differences (one-sided at the bounds), evaluated with u as one batch of 2d + 1 points
+    d = len(u)
+    h = _worker['step'] * np.eye(d)
+    hi = np.minimum(u + h, 1.0)
+    lo = np.maximum(u - h, 0.0)
+    losses = _evaluate(np.vstack([u, hi, lo]))
+    span = np.diag(hi - lo)
+    _worker['evaluations'] += 2 * d + 1
+    return float(losses[0]), (losses[1:d + 1] - losses[d + 1:]) / span
+
+def calibrate_from_start(task: Tuple[int, np.ndarray]) -> dict:
+    """Wrapper for multiprocessing: one L-BFGS-B run from a start point (unit coordinates)"""
+    start, u0 = task
+    _worker['evaluations'] = 0
+    fit = minimize(_loss_and_gradient, u0, jac=True, method='L-BFGS-B', bounds=[(0.0, 1.0)] * len(u0),
+                   options={'maxiter': _worker['maxiter']})
+    span = _worker['upper'] - _worker['lower']
+    return {
+        'start': start,
+        **{f"{name}_start": v for name, v in zip(_worker['names'], _worker['lower'] + u0 * span)},
+        **{name: v for name, v in zip(_worker['names'], _worker['lower'] + fit.x * span)},
+        'loss': float(fit.fun),
+        'evaluations': _worker['evaluations'],
+        'converged': bool(fit.success),
+    }
+
+@dataclass
+class CalibrationResult:
+    params: SimulationParams  # base params with the best fit applied
+    values: Dict[str, float]
+    loss: float
+    starts: pd.DataFrame  # one row per start: initial and fitted values, loss, evaluations, converged
+    seconds: float
+
+def calibrate(base_params: SimulationParams, observed: Mapping[str, Sequence[float]],
+              names: Sequence[str] = CALIBRATION_FIELDS, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+              n_starts: int = 8, n_sims: int = 64, step: float = 0.01, maxiter: int = 100,
+              weights: Optional[Mapping[str, float]] = None, seed: int = 0,
+              processes: Optional[int] = None) -> CalibrationResult:
+    """Fit continuous params so the path-mean trajectories match observed series.
+
+    observed maps metrics (e.g. 'price', 'providers') to weekly values from
+    week 0; see trajectory_loss. Every candidate runs on the same n_sims
+    noise paths of base_params.seed (common random numbers), so the loss is
+    a deterministic, near-smooth function of the params.
+
+    Each start runs L-BFGS-B in bounds-scaled coordinates on its own worker;
+    a loss plus its finite-difference gradient (step, as a share of each
+    range) is one batched simulate_batch call. The first start is
+    base_params itself, the others a Latin hypercube over bounds (default
+    default_bounds(base_params, 0.75, names)).
+    """
+    names = tuple(names)
+    structural = set(names) & set(STRUCTURAL_FIELDS)
+    if structural:
+        raise ValueError(f"Not continuous params: {sorted(structural)}")
+    bounds = dict(bounds) if bounds is not None else default_bounds(base_params, 0.75, names)
+    missing = set(names) - set(bounds)
+    if missing:
+        raise ValueError(f"No bounds for: {sorted(missing)}")
+    observed = {name: np.asarray(values, dtype=float) for name, values in observed.items()}
+    unknown = set(observed) - set(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+    if any(len(values) > base_params.T for values in observed.values()):
+        raise ValueError(f"Observed series are longer than the horizon T={base_params.T}")
+    lower, upper = np.array([bounds[name] for name in names], dtype=float).T
+
+    base = np.array([float(getattr(base_params, name)) for name in names])
+    starts = [np.clip((base - lower) / (upper - lower), 0.0, 1.0)]
+    if n_starts > 1:
+        unit_bounds = {name: (0.0, 1.0) for name in names}
+        starts.extend(sample_design(unit_bounds, n_starts - 1, 'lhs', seed)[0])
+    noise = draw_random_block(base_params, path_seeds(base_params.seed, 0, n_sims))
+
+    print(f"Calibrating {len(names)} params from {len(starts)} starts ({n_sims} sims per evaluation)...")
+    start_time = time.time()
+
+    processes = min(processes or cpu_count(), len(starts))
+    initargs = (base_params, names, lower, upper, observed, dict(weights) if weights else None, noise, step, maxiter)
+    with Pool(processes=processes, initializer=_init_calibration_worker, initargs=initargs) as pool:
+        rows = list(pool.imap_unordered(calibrate_from_start, enumerate(starts)))
+    table = pd.DataFrame(rows).set_index('start').sort_index()
+
+    duration = time.time() - start_time
+    print(f"Completed in {duration:.2f} seconds ({table['evaluations'].sum()} evaluations)")
+
+    best = table['loss'].idxmin()
+    values = {name: float(table.at[best, name]) for name in names}
+    return CalibrationResult(replace(base_params, **values), values, float(table.at[best, 'loss']), table, duration)
@@ -1,7 +1,8 @@
 import numpy as np
 import math
-from dataclasses import dataclass, field
-from typing import List, Literal, Optional
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Dict, Iterator, List, Literal, Optional, Sequence, Tuple
 
 # Constants matching JS implementation
 DEMAND_TYPES = Literal['consistent', 'high-to-decay', 'growth', 'volatile']
@@ -9,6 +10,10 @@ MACRO_TYPES = Literal['neutral', 'bullish', 'bearish']
 EMISSION_MODELS = Literal['fixed', 'kpi']
 REVENUE_STRATEGIES = Literal['burn', 'reserve']
 
+# Bump whenever a change alters simulated values for the same params + seed;
+# cached runs (see cache.py) are keyed on it
+ENGINE_VERSION = 'py-engine-2'
+
 @dataclass
 class SimulationParams:
     T: int
@@ -43,6 +48,9 @@ class SimulationParams:
     # Module 5
     growthCallEventWeek: Optional[int] = None
     growthCallEventPct: Optional[float] = None
+    
+    # Weekly demand level the demand curves scale
+    baseDemand: float = 12000
 
 @dataclass
 class SimResult:
@@ -70,25 +78,136 @@ class SimResult:
     treasuryBalance: float
     vampireChurn: float
 
-def get_demand_series(T: int, base: float, type: DEMAND_TYPES, rng: np.random.Generator) -> np.ndarray:
+# Per-week metrics recorded by the engine (every SimResult field except t)
+RESULT_FIELDS = tuple(f.name for f in fields(SimResult) if f.name != 't')
+
+class PathView(Sequence):
+    """Lazy List[SimResult] view of one path; rows are built on access."""
+    
+    def __init__(self, result: 'BatchResult', index: int):
+        self._result = result
+        self._index = index
+        
+    def __len__(self) -> int:
+        return self._result.T
+    
+    def __getitem__(self, t):
+        if isinstance(t, slice):
+            return [self[i] for i in range(*t.indices(len(self)))]
+        if t < 0:
+            t += len(self)
+        if not 0 <= t < len(self):
+            raise IndexError(t)
+        row = dict(zip(self._result.metrics, self._result.data[:, self._index, t].tolist()))
+        # Metrics the run did not record read as NaN
+        return SimResult(t=t, **{name: row.get(name, math.nan) for name in RESULT_FIELDS})
+
+class BatchResult:
+    """Struct-of-arrays engine output.
+    
+    data[m, i, t] holds metric self.metrics[m] of path i in week t, so each
+    metric is a contiguous (n_sims, T) float64 block. Indexing or iterating
+    yields PathView rows for callers written against List[List[SimResult]].
+    metrics defaults to every RESULT_FIELDS entry; runs that record fewer
+    (see simulate_batch) hold only those rows. origin is (cache.stream_key,
+    first path) of the seed-stream range the paths cover, when known.
+    """
+    
+    def __init__(self, n_sims: int, T: int, data: Optional[np.ndarray] = None,
+                 metrics: Sequence[str] = RESULT_FIELDS, origin: Optional[Tuple[str, int]] = None):
+        unknown = set(metrics) - set(RESULT_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+        self.metrics = tuple(metrics)
+        self._slots = {name: m for m, name in enumerate(self.metrics)}
+        if data is None:
+            data = np.empty((len(self.metrics), n_sims, T))
+        if data.shape != (len(self.metrics), n_sims, T):
+            raise ValueError(f"Expected data of shape {(len(self.metrics), n_sims, T)}, got {data.shape}")
+        self.data = data
+        self.origin = origin
+        
+    @property
+    def n_sims(self) -> int:
+        return self.data.shape[1]
+    
+    @property
+    def T(self) -> int:
+        return self.data.shape[2]
+    
+    def metric(self, name: str) -> np.ndarray:
+        """(n_sims, T) view of one metric."""
+        return self.data[self._slots[name]]
+    
+    def __len__(self) -> int:
+        return self.n_sims
+    
+    def __getitem__(self, i: int) -> PathView:
+        if i < 0:
+            i += self.n_sims
+        if not 0 <= i < self.n_sims:
+            raise IndexError(i)
+        return PathView(self, i)
+    
+    def __iter__(self) -> Iterator[PathView]:
+        return (PathView(self, i) for i in range(self.n_sims))
+    
+    @classmethod
+    def from_results(cls, results: Sequence[Sequence[SimResult]], T: int) -> 'BatchResult':
+        batch = cls(len(results), T)
+        for m, name in enumerate(batch.metrics):
+            batch.data[m] = [[getattr(row, name) for row in res[:T]] for res in results]
+        return batch
+
+# Demand shapes: deterministic curve over weeks t and multiplicative noise scale
+DEMAND_CURVES = {
+    'consistent': lambda t: np.ones(len(t)),
+    'high-to-decay': lambda t: 1.6 * np.exp(-t / 10) + 0.6,
+    'growth': lambda t: 0.8 + 0.02 * t,
+    'volatile': lambda t: np.ones(len(t)),
+}
+DEMAND_VOLATILITY = {'consistent': 0.03, 'high-to-decay': 0.05, 'growth': 0.05, 'volatile': 0.20}
+
+@lru_cache(maxsize=None)
+def demand_curve(T: int, type: DEMAND_TYPES) -> np.ndarray:
+    """Cached (T,) deterministic demand curve; unknown types are flat"""
     t_vals = np.arange(T)
-    noise = rng.normal(0, 1, T)
+    curve = DEMAND_CURVES[type](t_vals) if type in DEMAND_CURVES else np.ones(T)
+    curve.setflags(write=False)
+    return curve
+
+def get_demand_batch(T: int, bases, types, noise: np.ndarray, start: int = 0) -> np.ndarray:
+    """Demand for a batch of paths in one vectorized call: (n_sims, T).
     
-    if type == 'consistent':
-        d = base * (1 + 0.03 * noise)
-    elif type == 'high-to-decay':
-        d = base * (1.6 * np.exp(-t_vals / 10) + 0.6) * (1 + 0.05 * noise)
-    elif type == 'growth':
-        d = base * (0.8 + 0.02 * t_vals) * (1 + 0.05 * noise)
-    elif type == 'volatile':
-        d = base * (1 + 0.20 * noise)
+    bases: scalar or (n_sims,) base demand per path.
+    types: one demand type for all paths, or a sequence with one per path.
+    noise: (n_sims, T) standard normals (or (T,) for a single path).
+    Demand is base * curve(t) * (1 + volatility * noise), floored at 0.
+    With start, noise covers only weeks start .. start + K - 1 of the T-week
+    curve and a (n_sims, K) slice is returned.
+    """
+    noise = np.asarray(noise)
+    bases = np.asarray(bases, dtype=float)
+    weeks = slice(start, start + noise.shape[-1])
+    if isinstance(types, str):
+        curve = demand_curve(T, types)[weeks]
+        volatility = DEMAND_VOLATILITY.get(types, 0.0)
     else:
-        d = np.full(T, base)
-        
+        # Mixed types: gather each path's curve and noise scale from the unique types
+        unique, codes = np.unique(np.asarray(types), return_inverse=True)
+        curve = np.stack([demand_curve(T, str(u))[weeks] for u in unique])[codes]
+        volatility = np.array([DEMAND_VOLATILITY.get(str(u), 0.0) for u in unique])[codes][:, None]
+    if bases.ndim == 1:
+        bases = bases[:, None]
+    d = bases * curve * (1 + volatility * noise)
     return np.maximum(0, d)
 
+def get_demand_series(T: int, base: float, type: DEMAND_TYPES, rng: np.random.Generator) -> np.ndarray:
+    noise = rng.normal(0, 1, T)
+    return get_demand_batch(T, base, type, noise)
+
 def simulate_one(params: SimulationParams, sim_seed: int) -> List[SimResult]:
-    rng = np.random.default_rng(sim_seed)
+    noise = draw_random_block(params, [sim_seed])[0]
     
     # Macro Settings
     mu, sigma = 0.002, 0.05
@@ -97,7 +216,7 @@ def simulate_one(params: SimulationParams, sim_seed: int) -> List[SimResult]:
     elif params.macro == 'bullish':
         mu, sigma = 0.015, 0.06
         
-    demands = get_demand_series(params.T, 12000, params.demandType, rng)
+    demands = get_demand_batch(params.T, params.baseDemand, params.demandType, noise[:, NOISE_DEMAND])
     results = []
     
     state = {
@@ -164,7 +283,7 @@ def simulate_one(params: SimulationParams, sim_seed: int) -> List[SimResult]:
         
         # Provider Growth/Churn
         max_growth = state['providers'] * 0.15
-        raw_delta = (incentive * 4.5 * churn_multiplier) + rng.normal() * 0.5
+        raw_delta = (incentive * 4.5 * churn_multiplier) + noise[t, NOISE_PROVIDER] * 0.5
         delta = max(-state['providers'] * 0.1, min(max_growth, raw_delta))
         
         # Vampire Attack
@@ -199,7 +318,7 @@ def simulate_one(params: SimulationParams, sim_seed: int) -> List[SimResult]:
         else:
             demand_pressure = params.kDemandPrice * math.tanh(scarcity)
             dilution_pressure = -params.kMintPrice * (minted / state['supply']) * 100
-            log_ret = mu + demand_pressure + dilution_pressure + sigma * rng.normal()
+            log_ret = mu + demand_pressure + dilution_pressure + sigma * noise[t, NOISE_PRICE]
             next_price = max(0.01, state['price'] * math.exp(log_ret))
             
             # Re-sync AMM
@@ -237,3 +356,337 @@ def simulate_one(params: SimulationParams, sim_seed: int) -> List[SimResult]:
         state['providers'] = max(2, state['providers'] + delta)
         
     return results
+
+def macro_drift(macro: MACRO_TYPES) -> tuple:
+    """(mu, sigma) of the weekly log-price random walk for a macro regime"""
+    if macro == 'bearish':
+        return -0.01, 0.06
+    if macro == 'bullish':
+        return 0.015, 0.06
+    return 0.002, 0.05
+
+def path_seeds(root_seed: int, start: int, stop: int) -> List[np.random.SeedSequence]:
+    """Seed streams for paths [start, stop) of a run seeded with root_seed.
+    
+    Path i gets the i-th child of np.random.SeedSequence(root_seed), built
+    directly from its spawn key so any worker can derive any slice without
+    coordination. Children are statistically independent (no collisions for
+    any n_sims) and can seed PCG64 or Philox generators alike.
+    """
+    return [np.random.SeedSequence(root_seed, spawn_key=(i,)) for i in range(start, stop)]
+
+# Channels of a pre-drawn random block (see draw_random_block)
+NOISE_DEMAND, NOISE_PROVIDER, NOISE_PRICE = 0, 1, 2
+NOISE_CHANNELS = 3
+
+# Weeks of recorded values buffered per metric before advance_batch
+# transposes them into the (n, K) outputs
+_WRITE_BLOCK_WEEKS = 16
+
+def _stream_layout(params: SimulationParams) -> tuple:
+    # Position in a path's normal stream of each (week, channel) variate, in
+    # the order simulate_one historically consumed its generator. Index
+    # n_draws points at a trailing zero (the price draw skipped at unlock).
+    T = params.T
+    layout = np.empty((T, NOISE_CHANNELS), dtype=np.intp)
+    layout[:, NOISE_DEMAND] = np.arange(T)
+    n_draws = T
+    for t in range(T):
+        layout[t, NOISE_PROVIDER] = n_draws
+        n_draws += 1
+        if t == params.investorUnlockWeek:
+            layout[t, NOISE_PRICE] = -1
+        else:
+            layout[t, NOISE_PRICE] = n_draws
+            n_draws += 1
+    layout[layout == -1] = n_draws
+    return layout, n_draws
+
+def draw_random_block(params: SimulationParams, seeds) -> np.ndarray:
+    """Every random variate the engine needs, drawn up front: (n_sims, T, 3).
+    
+    Stream layout: path i draws standard normals from default_rng(seeds[i])
+    (PCG64) in one call, in this order:
+      1. T demand shocks, weeks 0..T-1         -> block[i, :, NOISE_DEMAND]
+      2. then per week t: one provider shock   -> block[i, t, NOISE_PROVIDER]
+         followed by one price shock           -> block[i, t, NOISE_PRICE]
+    The investor unlock week moves price through the AMM instead, so it draws
+    no price shock; its NOISE_PRICE slot is 0 and later draws shift up by one.
+    The same seeds therefore always give the same block, and passing one
+    block to several runs (noise=) makes them common-random-numbers runs.
+    """
+    layout, n_draws = _stream_layout(params)
+    block = np.empty((len(seeds), params.T, NOISE_CHANNELS))
+    z = np.zeros(n_draws + 1)
+    for i, seed in enumerate(seeds):
+        np.random.default_rng(seed).standard_normal(out=z[:n_draws])
+        block[i] = z[layout]
+    return block
+
+@dataclass
+class EngineState:
+    """Per-path state carried from one week to the next by advance_batch.
+    
+    Every field is a float64 array with one entry per path, except
+    reward_ring, which is (lag, n_sims): slot t % lag holds the reward
+    minted in week t.
+    """
+    supply: np.ndarray
+    price: np.ndarray
+    providers: np.ndarray
+    service_price: np.ndarray
+    treasury: np.ndarray
+    low_profit_weeks: np.ndarray
+    reward_ring: np.ndarray
+    pool_usd: np.ndarray
+    pool_tokens: np.ndarray
+    k_amm: np.ndarray
+    
+    @classmethod
+    def initial(cls, params: SimulationParams, n: int) -> 'EngineState':
+        initial_providers = params.initialProviders
+        if np.ndim(initial_providers) == 0:
+            initial_providers = initial_providers or 30
+        else:
+            initial_providers = np.where(initial_providers == 0, 30, initial_providers)
+            
+        price = np.full(n, params.initialPrice, dtype=float)
+        lag = max(1, params.rewardLagWeeks)
+        
+        # AMM Initial
+        pool_usd = np.full(n, params.initialLiquidity, dtype=float)
+        pool_tokens = pool_usd / price
+        return cls(
+            supply=np.full(n, params.initialSupply, dtype=float),
+            price=price,
+            providers=np.full(n, initial_providers, dtype=float),
+            service_price=np.full(n, 0.5),
+            treasury=np.zeros(n),
+            low_profit_weeks=np.zeros(n),
+            reward_ring=np.full((lag, n), params.providerCostPerWeek * 1.5),
+            pool_usd=pool_usd,
+            pool_tokens=pool_tokens,
+            k_amm=pool_usd * pool_tokens,
+        )
+        
+    def take(self, rows) -> 'EngineState':
+        """State of a subset of paths (copies)"""
+        return EngineState(**{f.name: getattr(self, f.name)[..., rows].copy() for f in fields(self)})
+    
+    def put(self, rows, other: 'EngineState'):
+        """Write back the state of a subset of paths taken with take()"""
+        for f in fields(self):
+            getattr(self, f.name)[..., rows] = getattr(other, f.name)
+            
+def simulate_batch(params: SimulationParams, seeds, out: Optional[BatchResult] = None,
+                   noise: Optional[np.ndarray] = None, metrics: Sequence[str] = RESULT_FIELDS,
+                   reducers: Sequence = ()) -> BatchResult:
+    """Vectorized simulate_one: advances every path together, one week per step.
+    
+    Path i follows exactly the same state machine and random stream as
+    simulate_one(params, seeds[i]). Results are written into `out` (allocated
+    when omitted), which must hold len(seeds) paths of params.T weeks.
+    `noise` is an optional pre-drawn draw_random_block(); when given, seeds
+    are not used.
+    
+    Numeric params may also be (n_sims,) arrays giving each path its own
+    value (see sweep.py). T, investorUnlockWeek, rewardLagWeeks, demandType,
+    macro, emissionModel and revenueStrategy must stay scalar.
+    
+    Only `metrics` are stored (and values that feed nothing else are not
+    computed); a given `out` records its own metrics instead.
+    
+    reducers are online reductions fed every week as the run advances
+    (see streaming.WeeklyMoments and friends): each gets begin(n) once,
+    then observe(t, week) after week t, where week maps at least its
+    `metrics` to the (n,) values of that week. With metrics=() nothing of
+    the trajectories is kept beyond the current week.
+    """
+    if noise is None:
+        noise = draw_random_block(params, seeds)
+    n = noise.shape[0]
+    T = params.T
+    demands = get_demand_batch(T, params.baseDemand, params.demandType, noise[:, :, NOISE_DEMAND])
+    if out is None:
+        out = BatchResult(n, T, metrics=metrics)
+    elif (out.n_sims, out.T) != (n, T):
+        raise ValueError(f"Output holds {out.n_sims} paths x {out.T} weeks, expected {n} x {T}")
+        
+    for reducer in reducers:
+        reducer.begin(n)
+    advance_batch(params, EngineState.initial(params, n), 0, demands, noise,
+                  {name: out.metric(name) for name in out.metrics}, reducers)
+    return out
+
+def replay_reducers(result: BatchResult, reducers: Sequence, t0: int = 0):
+    """Feed recorded paths to reducers week by week, as simulate_batch would have"""
+    if not reducers:
+        return
+    for reducer in reducers:
+        reducer.begin(result.n_sims)
+    for t in range(result.T):
+        week = {name: np.asarray(result.metric(name)[:, t]) for name in result.metrics}
+        for reducer in reducers:
+            reducer.observe(t0 + t, week)
+            
+def advance_batch(params: SimulationParams, state: EngineState, t0: int, demands: np.ndarray, noise: np.ndarray,
+                  cols: Dict[str, np.ndarray], reducers: Sequence = ()) -> EngineState:
+    """Run weeks t0 .. t0 + K - 1 of every path from `state`, updating it in place.
+    
+    demands: (n, K) demand of those weeks; noise: (n, K, 3) their slice of
+    draw_random_block(). cols maps each metric to record to an (n, K) array
+    that receives the weekly values; metrics left out are skipped. Each
+    reducer observes every week (see simulate_batch). Splitting a run into
+    consecutive calls gives exactly the values of one call over all weeks.
+    """
+    n, K = demands.shape
+    mu, sigma = macro_drift(params.macro)
+    provider_noise = noise[:, :, NOISE_PROVIDER]
+    price_noise = noise[:, :, NOISE_PRICE]
+    
+    supply, price, providers = state.supply, state.price, state.providers
+    service_price, treasury, low_profit_weeks = state.service_price, state.treasury, state.low_profit_weeks
+    reward_ring = state.reward_ring
+    pool_usd, pool_tokens, k_amm = state.pool_usd, state.pool_tokens, state.k_amm
+    lag = reward_ring.shape[0]
+    wanted = set(cols).union(*(reducer.metrics for reducer in reducers))
+    record_flows = not wanted.isdisjoint(('solvencyScore', 'netDailyLoss', 'dailyMintUsd', 'dailyBurnUsd'))
+    # Writing column k of a row-major (n, K) output touches one cache line per
+    # path; weeks go to contiguous (weeks, n) rows instead and are transposed
+    # into the outputs a block at a time
+    block = max(1, min(K, _WRITE_BLOCK_WEEKS))
+    buffers = {name: np.empty((block, n)) for name in cols}
+    
+    # Every path runs all T weeks: no state is absorbing. Paths pinned at the
+    # price floor still mint (so supply moves off its floor), and demand and
+    # provider noise keep service price and node counts moving, so a
+    # "collapsed" path cannot be frozen and filled without changing values.
+    for k in range(K):
+        t = t0 + k
+        demand = demands[:, k]
+        capacity = np.maximum(0.001, providers * params.baseCapacityPerProvider)
+        demand_served = np.minimum(demand, capacity)
+        
+        scarcity = (demand - capacity) / capacity
+        service_price = np.minimum(np.maximum(service_price * (1 + 0.6 * scarcity), 0.05), 5.0)
+        
+        safe_price = np.maximum(price, 0.0001)
+        tokens_spent = (demand_served * service_price) / safe_price
+        
+        burned_raw = params.burnPct * tokens_spent
+        burned = np.minimum(supply * 0.95, burned_raw)
+        
+        # Emissions
+        saturation = np.minimum(1.0, providers / 5000.0)
+        emission_factor = 0.6 + 0.4 * np.tanh(demand / 15000.0) - (0.2 * saturation)
+        
+        if params.emissionModel == 'kpi':
+            utilization_ratio = np.minimum(1, demand_served / capacity)
+            emission_factor *= np.maximum(0.3, utilization_ratio)
+            emission_factor = np.where(price < params.initialPrice * 0.8, emission_factor * 0.6, emission_factor)
+            
+        minted = np.maximum(0, np.minimum(params.maxMintWeekly, params.maxMintWeekly * emission_factor))
+        supply = np.maximum(1000.0, supply + minted - burned)
+        
+        # Rewards
+        instant_reward_value = (minted / np.maximum(providers, 0.1)) * safe_price
+        reward_ring[t % lag] = instant_reward_value
+        delayed_reward = reward_ring[(t + 1) % lag]
+        profit = delayed_reward - params.providerCostPerWeek
+        incentive = profit / params.providerCostPerWeek
+        
+        low_profit = profit < params.churnThreshold
+        low_profit_weeks = np.where(low_profit, low_profit_weeks + 1, np.maximum(0, low_profit_weeks - 1))
+        
+        churn_multiplier = np.where(low_profit_weeks > 5, 4.0, np.where(low_profit_weeks > 2, 1.8, 1.0))
+        
+        # Provider Growth/Churn
+        max_growth = providers * 0.15
+        raw_delta = (incentive * 4.5 * churn_multiplier) + provider_noise[:, k] * 0.5
+        delta = np.maximum(-providers * 0.1, np.minimum(max_growth, raw_delta))
+        
+        # Vampire Attack
+        vampire_churn_amount = np.zeros(n)
+        vampire = params.competitorYield > 0.2
+        if np.any(vampire):
+            vampire_churn_amount = np.where(vampire, providers * params.competitorYield * 0.025, 0.0)
+            delta = delta - vampire_churn_amount
+            
+        # ROI Churn
+        weekly_reward_usd = instant_reward_value
+        paying = weekly_reward_usd > 0
+        payback_months = np.divide(params.hardwareCost, weekly_reward_usd * 4.33, out=np.full(n, 999.0), where=paying)
+        delta = np.where(payback_months > 24, delta - providers * 0.0125, delta)
+        delta = np.where(payback_months > 36, delta - providers * 0.025, delta)
+        
+        # Price Model
+        if t == params.investorUnlockWeek:
+            unlock_amount = supply * params.investorSellPct
+            pool_tokens = pool_tokens + unlock_amount
+            pool_usd = k_amm / pool_tokens
+            next_price = pool_usd / pool_tokens
+            net_flow = -unlock_amount
+            
+            price_drop_pct = np.maximum(0, 1 - (next_price / price))
+            panic_churn = providers * price_drop_pct * 1.5
+            delta = delta - panic_churn
+        else:
+            net_flow = None
+            demand_pressure = params.kDemandPrice * np.tanh(scarcity)
+            dilution_pressure = -params.kMintPrice * (minted / supply) * 100
+            log_ret = mu + demand_pressure + dilution_pressure + sigma * price_noise[:, k]
+            next_price = np.maximum(0.01, price * np.exp(log_ret))
+            
+            # Re-sync AMM
+            pool_usd = np.sqrt(k_amm * next_price)
+            pool_tokens = np.sqrt(k_amm / next_price)
+            
+        # Output-only metrics are computed when recorded or reduced
+        week = {
+            'price': price, 'supply': supply, 'demand': demand, 'demand_served': demand_served,
+            'providers': providers, 'capacity': capacity, 'servicePrice': service_price, 'minted': minted,
+            'burned': burned, 'profit': profit, 'scarcity': scarcity, 'incentive': incentive,
+            'vampireChurn': vampire_churn_amount,
+        }
+        if 'utilization' in wanted:
+            week['utilization'] = (demand_served / capacity) * 100
+        if 'netFlow' in wanted:
+            week['netFlow'] = np.zeros(n) if net_flow is None else net_flow
+        if 'churnCount' in wanted:
+            week['churnCount'] = np.where(delta < 0, np.abs(delta), 0)
+        if 'joinCount' in wanted:
+            week['joinCount'] = np.where(delta > 0, delta, 0)
+            
+        # Treasury / Sinking Fund
+        if record_flows:
+            daily_mint_usd = (minted / 7) * price
+            daily_burn_usd = (burned / 7) * price
+            solvency_score = np.full(n, 10.0)
+            minting = daily_mint_usd > 0
+            solvency_score[minting] = daily_burn_usd[minting] / daily_mint_usd[minting]
+            week.update(solvencyScore=solvency_score, netDailyLoss=daily_burn_usd - daily_mint_usd,
+                        dailyMintUsd=daily_mint_usd, dailyBurnUsd=daily_burn_usd)
+            
+        if params.revenueStrategy == 'reserve':
+            treasury = treasury + minted * price * 0.1
+            next_price = np.where(next_price < price, price - ((price - next_price) * 0.5), next_price)
+        else:
+            next_price = next_price * 1.001
+        week['treasuryBalance'] = treasury
+        
+        for name, buffer in buffers.items():
+            buffer[k % block] = week[name]
+        if k % block == block - 1 or k == K - 1:
+            k0 = k - k % block
+            for name, col in cols.items():
+                col[:, k0:k + 1] = buffers[name][:k + 1 - k0].T
+        for reducer in reducers:
+            reducer.observe(t0 + k, week)
+            
+        price = next_price
+        providers = np.maximum(2, providers + delta)
+        
+    state.supply, state.price, state.providers = supply, price, providers
+    state.service_price, state.treasury, state.low_profit_weeks = service_price, treasury, low_profit_weeks
+    state.pool_usd, state.pool_tokens = pool_usd, pool_tokens
+    return state
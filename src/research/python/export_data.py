@@ -1,22 +1,96 @@
 import json
 import os
 import copy
-from engine import SimulationParams
-from monte_carlo import run_monte_carlo, aggregate_results
+import time
+from typing import Dict, List, Optional, Tuple
+from engine import SimulationParams, RESULT_FIELDS
+from cache import ResultCache
+from streaming import REPORT_METRICS
+from artifacts import ARTIFACT_DIR, write_artifact, artifact_is_current, load_artifact, read_manifest
+from monte_carlo import run_monte_carlo, run_scenarios, aggregate_results, run_paired_comparison
 
-def export_scenario(scenario_name: str, params: SimulationParams, filename: str):
+def _needs_run(params: SimulationParams, n_sims: int, filename: str, stats: Optional[dict],
+               artifact_dir: Optional[str]) -> bool:
+    # A cached aggregate is enough unless the path artifact is missing or stale
+    if stats is None:
+        return True
+    return artifact_dir is not None and not artifact_is_current(_stem(filename), params, n_sims, artifact_dir)
+
+def _stem(filename: str) -> str:
+    return os.path.splitext(os.path.basename(filename))[0]
+
+def _recorded_metrics(artifact_dir: Optional[str]) -> Tuple[str, ...]:
+    # Artifacts hold every metric; without one, only what aggregate_results reads is recorded
+    return RESULT_FIELDS if artifact_dir is not None else REPORT_METRICS
+
+def export_scenario(scenario_name: str, params: SimulationParams, filename: str, n_sims: int = 1000,
+                    cache: Optional[ResultCache] = None, artifact_dir: Optional[str] = ARTIFACT_DIR):
+    """Run one scenario, write its full paths (see artifacts.py) and the JSON view of them"""
     print(f"\n--- Running Scenario: {scenario_name} ---")
     
-    # Run Simulation
-    results = run_monte_carlo(params, n_sims=1000)
-    stats = aggregate_results(results, params.T)
+    stats = cache.get_aggregate(params, n_sims) if cache is not None else None
+    if _needs_run(params, n_sims, filename, stats, artifact_dir):
+        # Run Simulation
+        results = run_monte_carlo(params, n_sims=n_sims, metrics=_recorded_metrics(artifact_dir))
+        if artifact_dir is not None:
+            write_artifact(_stem(filename), params, results, scenario_name, artifact_dir)
+        stats = aggregate_results(results, params.T)
+        if cache is not None:
+            cache.put_aggregate(params, n_sims, stats)
+    write_scenario(scenario_name, params, stats, n_sims, filename)
+
+def export_scenarios(scenarios: List[Tuple[str, SimulationParams, str]], n_sims: int = 1000,
+                     cache: Optional[ResultCache] = None, artifact_dir: Optional[str] = ARTIFACT_DIR):
+    """Run every (name, params, filename) scenario on one shared pool and
+    write each file (path artifact, then JSON) as soon as that scenario's
+    paths are complete. Scenarios already in the cache, with a current
+    artifact, are written straight from it."""
+    print(f"\n--- Running Scenarios: {', '.join(name for name, _, _ in scenarios)} ---")
+    start_time = time.time()
+    
+    specs = {name: (params, filename) for name, params, filename in scenarios}
+    to_run = {}
+    for name, (params, filename) in specs.items():
+        stats = cache.get_aggregate(params, n_sims) if cache is not None else None
+        if _needs_run(params, n_sims, filename, stats, artifact_dir):
+            to_run[name] = params
+        else:
+            print(f"Loaded {name} from cache")
+            write_scenario(name, params, stats, n_sims, filename)
+            
+    if to_run:
+        for name, results in run_scenarios(to_run, n_sims=n_sims, metrics=_recorded_metrics(artifact_dir)):
+            params, filename = specs[name]
+            if artifact_dir is not None:
+                write_artifact(_stem(filename), params, results, name, artifact_dir)
+            stats = aggregate_results(results, params.T)
+            if cache is not None:
+                cache.put_aggregate(params, n_sims, stats)
+            write_scenario(name, params, stats, n_sims, filename)
+            
+    print(f"Completed {len(scenarios)} scenarios in {time.time() - start_time:.2f} seconds")
+
+def export_scenario_from_artifact(filename: str, artifact_dir: str = ARTIFACT_DIR):
+    """Rebuild a scenario's JSON from its stored path artifact, without simulating.
     
+    Statistics come from the float32 paths, so they can differ from the
+    exported float64 run in the last few digits.
+    """
+    stem = _stem(filename)
+    manifest = read_manifest(stem, artifact_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No artifact for {filename} in {artifact_dir}")
+    params = SimulationParams(**manifest["params"])
+    stats = aggregate_results(load_artifact(stem, artifact_dir), manifest["T"])
+    write_scenario(manifest["scenario"], params, stats, manifest["n_sims"], filename)
+
+def write_scenario(scenario_name: str, params: SimulationParams, stats: dict, n_sims: int, filename: str):
     # Format Data
     export_data = {
         "metadata": {
             "engine": "Python/NumPy v1.0",
             "scenario": scenario_name,
-            "n_sims": 1000,
+            "n_sims": n_sims,
             "generated_at": "2025-04-10T12:00:00Z"
         },
         "time_series": []
@@ -39,6 +113,9 @@ def export_scenario(scenario_name: str, params: SimulationParams, filename: str)
         }
         export_data["time_series"].append(point)
         
+    write_export(export_data, filename)
+
+def write_export(export_data: dict, filename: str):
     # Save
     # Resolve path relative to THIS script file
     # src/research/python/export_data.py -> ../../../public/data
@@ -53,7 +130,41 @@ def export_scenario(scenario_name: str, params: SimulationParams, filename: str)
         
     print(f"✅ Data exported to {output_path}")
 
-def export_all_research_data():
+def export_comparison(scenarios: Dict[str, SimulationParams], baseline: str, filename: str, n_sims: int = 200):
+    """Paired (common random numbers) deltas of each scenario vs the baseline"""
+    print(f"\n--- Running Paired Comparison vs {baseline} ---")
+    
+    comparison = run_paired_comparison(scenarios, baseline, n_sims=n_sims)
+    stats = comparison.result()
+    T = scenarios[baseline].T
+    
+    export_data = {
+        "metadata": {
+            "engine": "Python/NumPy v1.0",
+            "baseline": baseline,
+            "method": "common random numbers, paired deltas, 95% CI",
+            "n_sims": n_sims,
+            "generated_at": "2025-04-10T12:00:00Z"
+        },
+        "scenarios": {}
+    }
+    
+    for name in scenarios:
+        series = []
+        for t in range(T):
+            point = {"week": t}
+            for key, label in (('price', 'price'), ('providers', 'nodes'), ('revenue', 'revenue')):
+                s = stats[name][key]
+                point[f"{label}_mean"] = float(s['mean'][t])
+                point[f"{label}_delta"] = float(s['delta_mean'][t])
+                point[f"{label}_delta_lo"] = float(s['delta_lo'][t])
+                point[f"{label}_delta_hi"] = float(s['delta_hi'][t])
+            series.append(point)
+        export_data["scenarios"][name] = series
+        
+    write_export(export_data, filename)
+
+def export_all_research_data(cache: Optional[ResultCache] = None, artifact_dir: Optional[str] = ARTIFACT_DIR):
     # Base Params (Onocoy V3 Calibrated - WITH STABILIZATION TWEAKS)
     # The previous base params were causing a death spiral ($0.10 -> $0.01) even in neutral cases
     # We increase demand and reduce initial burn to stabilize the baseline.
@@ -83,32 +194,42 @@ def export_all_research_data():
         revenueStrategy='burn'
     )
     
-    # 1. Neutral (Base)
-    export_scenario("Neutral Case", base_params, "research_neutral.json")
+    # 1. Neutral (Base) = base_params
     
     # 2. Bull Market (High Demand, Bull Macro)
     bull_params = copy.deepcopy(base_params)
     bull_params.macro = 'bullish'
     bull_params.demandType = 'growth'
     bull_params.initialPrice = 0.12 # Slightly higher start
-    # Boost demand base significantly
-    # Note: engine.py's get_demand_series uses fixed base 12000. 
-    # We should update engine.py to use params.baseDemand if possible, but for now we rely on macro drift.
-    export_scenario("Bull Market", bull_params, "research_bull.json")
+    # Demand base stays at the default params.baseDemand (12000); for now we rely on macro drift.
     
     # 3. Bear Market (Low Demand, Bear Macro)
     bear_params = copy.deepcopy(base_params)
     bear_params.macro = 'bearish'
     bear_params.demandType = 'consistent' # Stagnant demand
     bear_params.investorSellPct = 0.20 # Sell pressure
-    export_scenario("Bear Market", bear_params, "research_bear.json")
 
     # 4. Hyper Growth (Extreme Bull)
     hyper_params = copy.deepcopy(base_params)
     hyper_params.macro = 'bullish'
     hyper_params.demandType = 'high-to-decay' # Viral adoption
     hyper_params.maxMintWeekly = 3_000_000 # Allow more supply for growth
-    export_scenario("Hyper Growth", hyper_params, "research_hyper.json")
+    
+    # All four share one pool; each file is written as its scenario finishes
+    export_scenarios([
+        ("Neutral Case", base_params, "research_neutral.json"),
+        ("Bull Market", bull_params, "research_bull.json"),
+        ("Bear Market", bear_params, "research_bear.json"),
+        ("Hyper Growth", hyper_params, "research_hyper.json"),
+    ], cache=cache, artifact_dir=artifact_dir)
+    
+    # 5. Paired deltas vs Neutral on common random numbers
+    export_comparison({
+        "Neutral Case": base_params,
+        "Bull Market": bull_params,
+        "Bear Market": bear_params,
+        "Hyper Growth": hyper_params,
+    }, "Neutral Case", "research_comparison.json")
 
 if __name__ == "__main__":
-    export_all_research_data()
+    export_all_research_data(cache=ResultCache())
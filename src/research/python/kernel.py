@@ -0,0 +1,240 @@
+import math
+import numpy as np
+from typing import Optional, Sequence
+from engine import (SimulationParams, BatchResult, RESULT_FIELDS, NOISE_DEMAND, NOISE_PROVIDER, NOISE_PRICE,
+                    macro_drift, draw_random_block, get_demand_batch, replay_reducers)
+
+# Optional JIT: numba compiles the kernel when installed, otherwise the same
+# function runs as plain Python (slow, but identical results)
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# Index of each metric in RESULT_FIELDS; slots maps it to a BatchResult.data row (module constants are frozen into the kernel)
+_PRICE = RESULT_FIELDS.index('price')
+_SUPPLY = RESULT_FIELDS.index('supply')
+_DEMAND = RESULT_FIELDS.index('demand')
+_DEMAND_SERVED = RESULT_FIELDS.index('demand_served')
+_PROVIDERS = RESULT_FIELDS.index('providers')
+_CAPACITY = RESULT_FIELDS.index('capacity')
+_SERVICE_PRICE = RESULT_FIELDS.index('servicePrice')
+_MINTED = RESULT_FIELDS.index('minted')
+_BURNED = RESULT_FIELDS.index('burned')
+_UTILIZATION = RESULT_FIELDS.index('utilization')
+_PROFIT = RESULT_FIELDS.index('profit')
+_SCARCITY = RESULT_FIELDS.index('scarcity')
+_INCENTIVE = RESULT_FIELDS.index('incentive')
+_SOLVENCY = RESULT_FIELDS.index('solvencyScore')
+_NET_DAILY_LOSS = RESULT_FIELDS.index('netDailyLoss')
+_DAILY_MINT_USD = RESULT_FIELDS.index('dailyMintUsd')
+_DAILY_BURN_USD = RESULT_FIELDS.index('dailyBurnUsd')
+_NET_FLOW = RESULT_FIELDS.index('netFlow')
+_CHURN = RESULT_FIELDS.index('churnCount')
+_JOIN = RESULT_FIELDS.index('joinCount')
+_TREASURY = RESULT_FIELDS.index('treasuryBalance')
+_VAMPIRE = RESULT_FIELDS.index('vampireChurn')
+
+@njit(cache=True)
+def _record(out, slot, i, t, value):
+    # slot is the metric's row in out, or -1 when it is not recorded
+    if slot >= 0:
+        out[slot, i, t] = value
+
+@njit(cache=True)
+def _simulate_kernel(out, slots, demands, noise,
+                     initial_supply, initial_price, initial_providers, max_mint_weekly, burn_pct,
+                     initial_liquidity, investor_unlock_week, investor_sell_pct, provider_cost_per_week,
+                     base_capacity_per_provider, k_demand_price, k_mint_price, reward_lag_weeks,
+                     churn_threshold, hardware_cost, competitor_yield, kpi_emissions, reserve_strategy,
+                     mu, sigma):
+    # Scalar port of simulate_one, one path at a time over preallocated arrays
+    n, T = demands.shape
+    lag = max(1, reward_lag_weeks)
+    reward_ring = np.empty(lag)
+
+    for i in range(n):
+        supply = initial_supply
+        price = initial_price
+        providers = initial_providers
+        service_price = 0.5
+        treasury = 0.0
+        low_profit_weeks = 0
+        reward_ring[:] = provider_cost_per_week * 1.5
+
+        pool_usd = initial_liquidity
+        pool_tokens = pool_usd / price
+        k_amm = pool_usd * pool_tokens
+
+        for t in range(T):
+            demand = demands[i, t]
+            capacity = max(0.001, providers * base_capacity_per_provider)
+            demand_served = min(demand, capacity)
+            utilization = (demand_served / capacity) * 100
+
+            scarcity = (demand - capacity) / capacity
+            service_price = min(max(service_price * (1 + 0.6 * scarcity), 0.05), 5.0)
+
+            safe_price = max(price, 0.0001)
+            tokens_spent = (demand_served * service_price) / safe_price
+
+            burned_raw = burn_pct * tokens_spent
+            burned = min(supply * 0.95, burned_raw)
+
+            # Emissions
+            saturation = min(1.0, providers / 5000.0)
+            emission_factor = 0.6 + 0.4 * math.tanh(demand / 15000.0) - (0.2 * saturation)
+
+            if kpi_emissions:
+                utilization_ratio = min(1.0, demand_served / capacity)
+                emission_factor *= max(0.3, utilization_ratio)
+                if price < initial_price * 0.8:
+                    emission_factor *= 0.6
+
+            minted = max(0.0, min(max_mint_weekly, max_mint_weekly * emission_factor))
+            supply = max(1000.0, supply + minted - burned)
+
+            # Rewards
+            instant_reward_value = (minted / max(providers, 0.1)) * safe_price
+            reward_ring[t % lag] = instant_reward_value
+            delayed_reward = reward_ring[(t + 1) % lag]
+            profit = delayed_reward - provider_cost_per_week
+            incentive = profit / provider_cost_per_week
+
+            if profit < churn_threshold:
+                low_profit_weeks += 1
+            else:
+                low_profit_weeks = max(0, low_profit_weeks - 1)
+
+            churn_multiplier = 1.0
+            if low_profit_weeks > 2:
+                churn_multiplier = 1.8
+            if low_profit_weeks > 5:
+                churn_multiplier = 4.0
+
+            # Provider Growth/Churn
+            max_growth = providers * 0.15
+            raw_delta = (incentive * 4.5 * churn_multiplier) + noise[i, t, NOISE_PROVIDER] * 0.5
+            delta = max(-providers * 0.1, min(max_growth, raw_delta))
+
+            # Vampire Attack
+            vampire_churn_amount = 0.0
+            if competitor_yield > 0.2:
+                vampire_churn_amount = providers * competitor_yield * 0.025
+                delta -= vampire_churn_amount
+
+            # ROI Churn
+            payback_months = hardware_cost / (instant_reward_value * 4.33) if instant_reward_value > 0 else 999.0
+            if payback_months > 24:
+                delta -= providers * 0.0125
+            if payback_months > 36:
+                delta -= providers * 0.025
+
+            net_flow = 0.0
+
+            # Price Model
+            if t == investor_unlock_week:
+                unlock_amount = supply * investor_sell_pct
+                pool_tokens = pool_tokens + unlock_amount
+                pool_usd = k_amm / pool_tokens
+                next_price = pool_usd / pool_tokens
+                net_flow = -unlock_amount
+
+                price_drop_pct = max(0.0, 1 - (next_price / price))
+                delta -= providers * price_drop_pct * 1.5
+            else:
+                demand_pressure = k_demand_price * math.tanh(scarcity)
+                dilution_pressure = -k_mint_price * (minted / supply) * 100
+                log_ret = mu + demand_pressure + dilution_pressure + sigma * noise[i, t, NOISE_PRICE]
+                next_price = max(0.01, price * math.exp(log_ret))
+
+                # Re-sync AMM
+                pool_usd = math.sqrt(k_amm * next_price)
+                pool_tokens = math.sqrt(k_amm / next_price)
+
+            # Treasury / Sinking Fund
+            daily_mint_usd = (minted / 7) * price
+            daily_burn_usd = (burned / 7) * price
+            solvency_score = daily_burn_usd / daily_mint_usd if daily_mint_usd > 0 else 10.0
+
+            if reserve_strategy:
+                treasury += minted * price * 0.1
+                if next_price < price:
+                    next_price = price - ((price - next_price) * 0.5)
+            else:
+                next_price = next_price * 1.001
+
+            _record(out, slots[_PRICE], i, t, price)
+            _record(out, slots[_SUPPLY], i, t, supply)
+            _record(out, slots[_DEMAND], i, t, demand)
+            _record(out, slots[_DEMAND_SERVED], i, t, demand_served)
+            _record(out, slots[_PROVIDERS], i, t, providers)
+            _record(out, slots[_CAPACITY], i, t, capacity)
+            _record(out, slots[_SERVICE_PRICE], i, t, service_price)
+            _record(out, slots[_MINTED], i, t, minted)
+            _record(out, slots[_BURNED], i, t, burned)
+            _record(out, slots[_UTILIZATION], i, t, utilization)
+            _record(out, slots[_PROFIT], i, t, profit)
+            _record(out, slots[_SCARCITY], i, t, scarcity)
+            _record(out, slots[_INCENTIVE], i, t, incentive)
+            _record(out, slots[_SOLVENCY], i, t, solvency_score)
+            _record(out, slots[_NET_DAILY_LOSS], i, t, daily_burn_usd - daily_mint_usd)
+            _record(out, slots[_DAILY_MINT_USD], i, t, daily_mint_usd)
+            _record(out, slots[_DAILY_BURN_USD], i, t, daily_burn_usd)
+            _record(out, slots[_NET_FLOW], i, t, net_flow)
+            _record(out, slots[_CHURN], i, t, -delta if delta < 0 else 0.0)
+            _record(out, slots[_JOIN], i, t, delta if delta > 0 else 0.0)
+            _record(out, slots[_TREASURY], i, t, treasury)
+            _record(out, slots[_VAMPIRE], i, t, vampire_churn_amount)
+
+            price = next_price
+            providers = max(2.0, providers + delta)
+
+def simulate_batch_jit(params: SimulationParams, seeds, out: Optional[BatchResult] = None,
+                       noise: Optional[np.ndarray] = None, metrics: Sequence[str] = RESULT_FIELDS,
+                       reducers: Sequence = ()) -> BatchResult:
+    """simulate_batch on the compiled kernel (plain Python when numba is missing).
+
+    Consumes the same per-path random streams as simulate_one/simulate_batch,
+    so outputs agree with them to floating-point rounding. Only `metrics`
+    (or those of a given `out`) are stored. The kernel cannot call back into
+    Python, so reducers' inputs are recorded as well and replayed to them
+    after the run.
+    """
+    if noise is None:
+        noise = draw_random_block(params, seeds)
+    n = noise.shape[0]
+    if out is None:
+        out = BatchResult(n, params.T, metrics=metrics)
+    elif (out.n_sims, out.T) != (n, params.T):
+        raise ValueError(f"Output holds {out.n_sims} paths x {out.T} weeks, expected {n} x {params.T}")
+
+    demands = get_demand_batch(params.T, params.baseDemand, params.demandType, noise[:, :, NOISE_DEMAND])
+    mu, sigma = macro_drift(params.macro)
+
+    inputs = tuple(dict.fromkeys(m for r in reducers for m in r.metrics if m not in out.metrics))
+    recorded = BatchResult(n, params.T, metrics=out.metrics + inputs) if inputs else out
+    slots = np.full(len(RESULT_FIELDS), -1, dtype=np.int64)
+    for m, name in enumerate(recorded.metrics):
+        slots[RESULT_FIELDS.index(name)] = m
+        
+    _simulate_kernel(
+        recorded.data, slots, np.ascontiguousarray(demands, dtype=np.float64), noise,
+        float(params.initialSupply), float(params.initialPrice), float(params.initialProviders or 30),
+        float(params.maxMintWeekly), float(params.burnPct), float(params.initialLiquidity),
+        int(params.investorUnlockWeek), float(params.investorSellPct), float(params.providerCostPerWeek),
+        float(params.baseCapacityPerProvider), float(params.kDemandPrice), float(params.kMintPrice),
+        int(params.rewardLagWeeks), float(params.churnThreshold), float(params.hardwareCost),
+        float(params.competitorYield), params.emissionModel == 'kpi', params.revenueStrategy == 'reserve',
+        mu, sigma,
+    )
+    if recorded is not out:
+        out.data[...] = recorded.data[:len(out.metrics)]
+    replay_reducers(recorded, reducers)
+    return out
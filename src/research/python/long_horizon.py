@@ -0,0 +1,194 @@
+import json
+import os
+import time
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+from engine import (SimulationParams, EngineState, RESULT_FIELDS, NOISE_CHANNELS, NOISE_DEMAND,
+                    advance_batch, get_demand_batch, path_seeds, _stream_layout)
+from cache import run_key
+
+_MASK64 = (1 << 64) - 1
+
+def _pack_generators(generators: List[np.random.Generator]) -> Dict[str, np.ndarray]:
+    """PCG64 states of many generators as compact arrays (128-bit words split in two)"""
+    states = [g.bit_generator.state for g in generators]
+    return {
+        'state_hi': np.array([s['state']['state'] >> 64 for s in states], dtype=np.uint64),
+        'state_lo': np.array([s['state']['state'] & _MASK64 for s in states], dtype=np.uint64),
+        'inc_hi': np.array([s['state']['inc'] >> 64 for s in states], dtype=np.uint64),
+        'inc_lo': np.array([s['state']['inc'] & _MASK64 for s in states], dtype=np.uint64),
+        'has_uint32': np.array([s['has_uint32'] for s in states], dtype=np.uint8),
+        'uinteger': np.array([s['uinteger'] for s in states], dtype=np.uint32),
+    }
+
+def _unpack_generators(arrays: Dict[str, np.ndarray]) -> List[np.random.Generator]:
+    generators = []
+    for state_hi, state_lo, inc_hi, inc_lo, has_uint32, uinteger in zip(
+            arrays['state_hi'], arrays['state_lo'], arrays['inc_hi'], arrays['inc_lo'],
+            arrays['has_uint32'], arrays['uinteger']):
+        bit_generator = np.random.PCG64()
+        bit_generator.state = {
+            'bit_generator': 'PCG64',
+            'state': {'state': (int(state_hi) << 64) | int(state_lo), 'inc': (int(inc_hi) << 64) | int(inc_lo)},
+            'has_uint32': int(has_uint32),
+            'uinteger': int(uinteger),
+        }
+        generators.append(np.random.Generator(bit_generator))
+    return generators
+
+# Channels read from each cursor's generator
+_DEMAND_CHANNELS = [NOISE_DEMAND]
+_SHOCK_CHANNELS = [c for c in range(NOISE_CHANNELS) if c != NOISE_DEMAND]
+
+def _segment_layout(layout: np.ndarray, n_draws: int, t0: int, t1: int, channels: List[int]) -> tuple:
+    # The stream positions weeks t0 .. t1 - 1 read on the given channels form
+    # one contiguous run; returns (first position, run length, (K, channels)
+    # index into the run, where the run length points at a trailing zero)
+    positions = layout[t0:t1, channels]
+    drawn = positions[positions < n_draws]
+    if drawn.size == 0:
+        return 0, 0, np.zeros(positions.shape, dtype=np.intp)
+    first, count = int(drawn.min()), int(drawn.max()) + 1 - int(drawn.min())
+    if count != drawn.size:
+        raise ValueError(f"Weeks {t0}..{t1 - 1} do not read one contiguous run of the stream")
+    return first, count, np.where(positions < n_draws, positions - first, count)
+
+class NoiseCursors:
+    """Week-by-week reader of the draw_random_block() streams.
+
+    Each path's stream starts with T demand shocks and continues with the
+    provider/price shocks, so two generators per path are kept: one at the
+    next demand shock and one at the next provider/price shock. Positions
+    come from engine._stream_layout, so segments drawn in order reproduce
+    draw_random_block() exactly without holding all T weeks of noise.
+    """
+
+    def __init__(self, demand: List[np.random.Generator], shock: List[np.random.Generator]):
+        self.demand = demand
+        self.shock = shock
+
+    @classmethod
+    def start(cls, params: SimulationParams, seeds) -> 'NoiseCursors':
+        layout, n_draws = _stream_layout(params)
+        skip_demand = _segment_layout(layout, n_draws, 0, params.T, _DEMAND_CHANNELS)[0]
+        skip_shock = _segment_layout(layout, n_draws, 0, params.T, _SHOCK_CHANNELS)[0]
+        demand, shock = [], []
+        for seed in seeds:
+            g = np.random.default_rng(seed)
+            g.standard_normal(skip_demand)
+            demand.append(g)
+            g = np.random.default_rng(seed)
+            g.standard_normal(skip_shock)  # skip past the demand shocks
+            shock.append(g)
+        return cls(demand, shock)
+
+    def draw(self, params: SimulationParams, rows: range, t0: int, t1: int) -> np.ndarray:
+        """(len(rows), t1 - t0, 3) noise of weeks t0 .. t1 - 1 for the given paths; advances them"""
+        layout, n_draws = _stream_layout(params)
+        _, n_demand, demand_index = _segment_layout(layout, n_draws, t0, t1, _DEMAND_CHANNELS)
+        _, n_shock, shock_index = _segment_layout(layout, n_draws, t0, t1, _SHOCK_CHANNELS)
+        block = np.empty((len(rows), t1 - t0, NOISE_CHANNELS))
+        zd = np.zeros(n_demand + 1)
+        zs = np.zeros(n_shock + 1)
+        for j, i in enumerate(rows):
+            self.demand[i].standard_normal(out=zd[:n_demand])
+            self.shock[i].standard_normal(out=zs[:n_shock])
+            block[j][:, _DEMAND_CHANNELS] = zd[demand_index]
+            block[j][:, _SHOCK_CHANNELS] = zs[shock_index]
+        return block
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {f"demand/{k}": v for k, v in _pack_generators(self.demand).items()}
+        arrays.update({f"shock/{k}": v for k, v in _pack_generators(self.shock).items()})
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'NoiseCursors':
+        return cls(*(_unpack_generators({k.split('/', 1)[1]: v for k, v in arrays.items() if k.startswith(f"{c}/")})
+                     for c in ('demand', 'shock')))
+
+CHECKPOINT_FILE = 'checkpoint.npz'
+PATHS_FILE = 'paths.npy'
+
+def _save_checkpoint(directory: str, key: str, week: int, metrics: Sequence[str], state: EngineState,
+                     cursors: NoiseCursors):
+    path = os.path.join(directory, CHECKPOINT_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    arrays = {f"state/{name}": value for name, value in vars(state).items()}
+    arrays.update({f"rng/{name}": value for name, value in cursors.to_arrays().items()})
+    meta = {'key': key, 'week': week, 'metrics': list(metrics)}
+    with open(tmp, 'wb') as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+    # Atomic publish: a crash mid-write leaves the previous checkpoint intact
+    os.replace(tmp, path)
+
+def _load_checkpoint(directory: str, key: str) -> Optional[tuple]:
+    try:
+        with np.load(os.path.join(directory, CHECKPOINT_FILE)) as f:
+            meta = json.loads(str(f['meta']))
+            if meta['key'] != key:
+                return None
+            state = EngineState(**{name.split('/', 1)[1]: f[name] for name in f.files if name.startswith('state/')})
+            cursors = NoiseCursors.from_arrays({name.split('/', 1)[1]: f[name] for name in f.files if name.startswith('rng/')})
+    except (FileNotFoundError, OSError, ValueError, KeyError):
+        return None
+    return meta['week'], state, cursors
+
+def run_long_horizon(params: SimulationParams, n_sims: int, directory: str, checkpoint_every: int = 52,
+                     metrics: Sequence[str] = ('price', 'providers', 'supply'), block_size: int = 10_000,
+                     resume: bool = True) -> np.memmap:
+    """Run n_sims paths of params over a long horizon (params.T weeks), resumably.
+
+    Weeks are simulated in segments of checkpoint_every. Each segment's
+    noise is drawn on the fly (see NoiseCursors) and paths advance in blocks
+    of block_size, so memory stays bounded by the segment rather than the
+    horizon. After each segment the recorded metrics are flushed to
+    <directory>/paths.npy, shape (metrics, n_sims, T), and the full engine
+    state plus RNG positions are saved to <directory>/checkpoint.npz.
+
+    With resume, a checkpoint of the same params/n_sims/metrics restarts
+    from its week; the result is identical to an uninterrupted run and to
+    simulate_batch(params, path_seeds(params.seed, 0, n_sims)). Params must
+    be scalar. Returns the paths file as a read-only memmap.
+    """
+    metrics = tuple(metrics)
+    missing = set(metrics) - set(RESULT_FIELDS)
+    if missing:
+        raise ValueError(f"Unknown metrics: {sorted(missing)}")
+    os.makedirs(directory, exist_ok=True)
+    key = run_key(params, n_sims, 'long-horizon', metrics=list(metrics))
+    paths_file = os.path.join(directory, PATHS_FILE)
+    T = params.T
+
+    checkpoint = _load_checkpoint(directory, key) if resume and os.path.exists(paths_file) else None
+    if checkpoint is not None:
+        week, state, cursors = checkpoint
+        paths = np.lib.format.open_memmap(paths_file, mode='r+')
+        print(f"Resuming {n_sims} paths x {T} weeks from week {week}...")
+    else:
+        week = 0
+        state = EngineState.initial(params, n_sims)
+        cursors = NoiseCursors.start(params, path_seeds(params.seed, 0, n_sims))
+        paths = np.lib.format.open_memmap(paths_file, mode='w+', shape=(len(metrics), n_sims, T))
+        print(f"Starting {n_sims} paths x {T} weeks...")
+    start_time = time.time()
+
+    while week < T:
+        stop = min(T, week + checkpoint_every)
+        buffer = np.empty((len(metrics), min(block_size, n_sims), stop - week))
+        for first in range(0, n_sims, block_size):
+            rows = range(first, min(n_sims, first + block_size))
+            noise = cursors.draw(params, rows, week, stop)
+            demands = get_demand_batch(T, params.baseDemand, params.demandType, noise[:, :, NOISE_DEMAND], start=week)
+            block = slice(rows.start, rows.stop)
+            sub = state.take(block)
+            cols = {name: buffer[m, :len(rows)] for m, name in enumerate(metrics)}
+            state.put(block, advance_batch(params, sub, week, demands, noise, cols))
+            paths[:, block, week:stop] = buffer[:, :len(rows)]
+        paths.flush()
+        _save_checkpoint(directory, key, stop, metrics, state, cursors)
+        week = stop
+        print(f"  week {week}/{T} ({time.time() - start_time:.1f}s)")
+
+    del paths
+    return np.load(paths_file, mmap_mode='r')
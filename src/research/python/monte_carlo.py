@@ -1,63 +1,521 @@
+import copy
 import time
+import weakref
 import numpy as np
 import pandas as pd
-from multiprocessing import Pool, cpu_count
-from engine import SimulationParams, simulate_one, SimResult
+from multiprocessing import Pool, cpu_count, shared_memory
+from dataclasses import dataclass, replace
+from typing import Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union
+from engine import SimulationParams, simulate_batch, path_seeds, draw_random_block, SimResult, BatchResult, RESULT_FIELDS
+from streaming import StreamingAggregator, PairedAggregator, REPORT_SCALE, REPORT_METRICS, report_reducers, series_values
+from cache import ResultCache, stream_key
+from kernel import simulate_batch_jit
 
-def run_simulation_batch(args):
-    """Wrapper for multiprocessing"""
-    params, seed = args
-    return simulate_one(params, seed)
+# Batch engines selectable via backend=; 'jit' runs the compiled kernel
+# (plain Python when numba is not installed)
+ENGINES = {'numpy': simulate_batch, 'jit': simulate_batch_jit}
 
-def run_monte_carlo(base_params: SimulationParams, n_sims: int = 1000):
+# Per-worker state, set once by the pool initializer so params are not
+# pickled again for every task
+_worker = {}
+
+def _shared_array(shm: shared_memory.SharedMemory, shape: tuple) -> np.ndarray:
+    """(shape) float64 view of a SharedMemory block that keeps the mapping alive.
+    
+    The block is closed once the last view of it is gone: the finalizer sits
+    on the memoryview frombuffer keeps as the array's base, which only dies
+    (releasing its export) after every view derived from the array.
+    """
+    data = np.frombuffer(shm.buf, dtype=np.float64, count=int(np.prod(shape)))
+    weakref.finalize(data.base, shm.close).atexit = False
+    return data.reshape(shape)
+
+def _init_worker(params: SimulationParams, backend: str = 'numpy', shm_name: Optional[str] = None, shape: Optional[tuple] = None,
+                 first_path: int = 0, store: Optional[str] = None, metrics: Sequence[str] = RESULT_FIELDS):
+    """Pool initializer: receive params and map the shared result block (or on-disk store) once per worker"""
+    _worker['params'] = params
+    _worker['engine'] = ENGINES[backend]
+    _worker['first_path'] = first_path
+    _worker['metrics'] = metrics
+    if shm_name is not None:
+        _worker['data'] = _shared_array(shared_memory.SharedMemory(name=shm_name), shape)
+    elif store is not None:
+        _worker['data'] = np.load(store, mmap_mode='r+')
+
+def run_simulation_chunk(bounds: Tuple[int, int]):
+    """Wrapper for multiprocessing: runs paths [start, stop) as one batch.
+    
+    With a shared block or store the paths are written in place (row
+    start - first_path) and only the bounds come back; otherwise the chunk's
+    (metrics, n, T) array is returned.
+    """
+    start, stop = bounds
+    params = _worker['params']
+    engine = _worker['engine']
+    metrics = _worker['metrics']
+    seeds = path_seeds(params.seed, start, stop)
+    if 'data' in _worker:
+        row = start - _worker['first_path']
+        out = BatchResult(stop - start, params.T, _worker['data'][:, row:row + stop - start], metrics=metrics)
+        engine(params, seeds, out=out)
+        if isinstance(_worker['data'], np.memmap):
+            _worker['data'].flush()
+        return start, None
+    return start, engine(params, seeds, metrics=metrics).data
+
+def aggregate_simulation_chunk(bounds: Tuple[int, int]) -> StreamingAggregator:
+    """Wrapper for multiprocessing: runs paths [start, stop) and returns only their aggregate"""
+    start, stop = bounds
+    params = _worker['params']
+    agg = StreamingAggregator(params.T, seed=start)
+    agg.add(_worker['engine'](params, path_seeds(params.seed, start, stop), metrics=REPORT_METRICS))
+    return agg
+
+def _init_scenarios_worker(scenarios: Dict[str, SimulationParams], backend: str = 'numpy',
+                           metrics: Sequence[str] = RESULT_FIELDS):
+    """Pool initializer for run_scenarios: every scenario's params, sent once"""
+    _worker['scenarios'] = scenarios
+    _worker['engine'] = ENGINES[backend]
+    _worker['metrics'] = metrics
+
+def run_scenario_chunk(task: Tuple[str, int, int]):
+    """Wrapper for multiprocessing: runs paths [start, stop) of one named scenario"""
+    name, start, stop = task
+    params = _worker['scenarios'][name]
+    return name, start, _worker['engine'](params, path_seeds(params.seed, start, stop), metrics=_worker['metrics']).data
+
+def _init_comparison_worker(scenarios: Dict[str, SimulationParams], baseline: str, noise_params: SimulationParams, backend: str = 'numpy'):
+    """Pool initializer for run_paired_comparison"""
+    _worker['scenarios'] = scenarios
+    _worker['baseline'] = baseline
+    _worker['noise_params'] = noise_params
+    _worker['engine'] = ENGINES[backend]
+
+def compare_simulation_chunk(bounds: Tuple[int, int]) -> PairedAggregator:
+    """Wrapper for multiprocessing: runs every scenario on one shared noise block for paths [start, stop)"""
+    start, stop = bounds
+    scenarios = _worker['scenarios']
+    noise_params = _worker['noise_params']
+    noise = draw_random_block(noise_params, path_seeds(noise_params.seed, start, stop))
+    agg = PairedAggregator(list(scenarios), _worker['baseline'], noise_params.T)
+    agg.add({name: _worker['engine'](params, None, noise=noise, metrics=REPORT_METRICS) for name, params in scenarios.items()})
+    return agg
+
+# Smallest adaptive chunk; below this per-task overhead outweighs batching gains
+_MIN_CHUNK = 16
+
+# Largest adaptive chunk for on-disk stores, bounding each worker's noise and
+# temporaries to a few hundred MB however many paths the run has
+_MAX_STORE_CHUNK = 4096
+
+def chunk_bounds(n_sims: int, processes: int, chunk_size: Optional[int] = None,
+                 max_chunk: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Split path indices into contiguous [start, stop) chunks.
+    
+    A fixed chunk_size gives equal chunks. Otherwise chunks are sized
+    guided-style: each takes a share of the remaining paths, so early chunks
+    are large (little IPC) and the tail is fine-grained (good load balance);
+    max_chunk caps that share.
+    """
+    bounds = []
+    start = 0
+    while start < n_sims:
+        if chunk_size is not None:
+            size = chunk_size
+        else:
+            size = max(_MIN_CHUNK, -(-(n_sims - start) // (2 * processes)))
+            if max_chunk is not None:
+                size = min(size, max_chunk)
+        stop = min(n_sims, start + max(1, size))
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+def run_monte_carlo(base_params: SimulationParams, n_sims: int = 1000,
+                    transport: Literal['pickle', 'shm', 'memmap'] = 'pickle',
+                    chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                    backend: Literal['numpy', 'jit'] = 'numpy', cache: Optional[ResultCache] = None,
+                    first_path: int = 0, store: Optional[str] = None,
+                    metrics: Sequence[str] = RESULT_FIELDS) -> BatchResult:
+    """Run n_sims paths in a process pool.
+    
+    Params reach each worker once through the pool initializer;
+    tasks are [start, stop) path ranges (see chunk_bounds) that the worker
+    runs through simulate_batch. Path i always uses the stream
+    path_seeds(base_params.seed, i, i + 1), so results are reproducible and
+    independent of chunking and worker count.
+    
+    backend picks the batch engine from ENGINES: 'numpy' (simulate_batch) or
+    'jit' (the compiled kernel, plain Python when numba is missing).
+    
+    transport='pickle' sends each chunk back through the pool as an array.
+    transport='shm' has workers write into one SharedMemory block laid out as
+    (metrics, n_sims, T) by path index; the returned BatchResult is a zero-copy
+    view of that block and keeps it mapped for as long as it is alive.
+    transport='memmap' does the same with an on-disk .npy file at `store`,
+    so runs larger than RAM only need disk: workers map it and write their
+    own rows, and the result is a read-only memmap (reopen later with
+    load_store). Chunks are capped at _MAX_STORE_CHUNK paths.
+    
+    With a cache, a previous run of the same params/seed/n_sims/backend is
+    loaded from disk instead of simulated, and new runs are stored.
+    
+    first_path offsets the seed stream: the run covers paths
+    [first_path, first_path + n_sims) of base_params.seed (see extend_monte_carlo).
+    
+    metrics limits what is recorded (e.g. REPORT_METRICS for runs that are
+    only aggregated); the result holds just those rows.
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+    if cache is not None:
+        cached = cache.get_paths(base_params, n_sims, first_path=first_path, metrics=metrics, backend=backend)
+        if cached is not None:
+            print(f"Loaded {n_sims} Monte Carlo Simulations from cache")
+            cached.origin = (stream_key(base_params), first_path)
+            return cached
+            
     print(f"Starting {n_sims} Monte Carlo Simulations...")
     start_time = time.time()
     
-    # Generate random seeds
-    seeds = np.random.randint(0, 1000000, n_sims)
-    tasks = [(base_params, seed) for seed in seeds]
+    processes = processes or cpu_count()
+    max_chunk = _MAX_STORE_CHUNK if transport == 'memmap' else None
+    tasks = [(first_path + start, first_path + stop) for start, stop in chunk_bounds(n_sims, processes, chunk_size, max_chunk)]
+    metrics = tuple(metrics)
+    shape = (len(metrics), n_sims, base_params.T)
     
     # Parallel Execution
-    with Pool(processes=cpu_count()) as pool:
-        results = pool.map(run_simulation_batch, tasks)
+    if transport == 'shm':
+        shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * 8))
+        try:
+            with Pool(processes=processes, initializer=_init_worker,
+                      initargs=(base_params, backend, shm.name, shape, first_path, None, metrics)) as pool:
+                for _ in pool.imap_unordered(run_simulation_chunk, tasks):
+                    pass
+        finally:
+            # The mapping outlives the name; the block is freed with the last view of it
+            shm.unlink()
+        results = BatchResult(n_sims, base_params.T, _shared_array(shm, shape), metrics=metrics)
+    elif transport == 'memmap':
+        if store is None:
+            raise ValueError("transport='memmap' needs a store path")
+        # Allocate the file up front (sparse on most filesystems); workers fill it in place
+        np.lib.format.open_memmap(store, mode='w+', dtype=np.float64, shape=shape).flush()
+        with Pool(processes=processes, initializer=_init_worker,
+                  initargs=(base_params, backend, None, None, first_path, store, metrics)) as pool:
+            for _ in pool.imap_unordered(run_simulation_chunk, tasks):
+                pass
+        results = load_store(store, metrics)
+    elif transport == 'pickle':
+        results = BatchResult(n_sims, base_params.T, metrics=metrics)
+        with Pool(processes=processes, initializer=_init_worker,
+                  initargs=(base_params, backend, None, None, first_path, None, metrics)) as pool:
+            for start, chunk in pool.imap_unordered(run_simulation_chunk, tasks):
+                row = start - first_path
+                results.data[:, row:row + chunk.shape[1]] = chunk
+    else:
+        raise ValueError(f"Unknown transport: {transport}")
         
     duration = time.time() - start_time
     print(f"Completed in {duration:.2f} seconds ({n_sims / duration:.0f} sims/sec)")
     
+    results.origin = (stream_key(base_params), first_path)
+    if cache is not None:
+        cache.put_paths(base_params, n_sims, results, first_path=first_path, backend=backend)
     return results
 
-def aggregate_results(results: list[list[SimResult]], T: int):
-    # Extract time series for key metrics
-    # Shape: (n_sims, T)
-    prices = np.zeros((len(results), T))
-    providers = np.zeros((len(results), T))
-    revenues = np.zeros((len(results), T))
-    
-    for i, res in enumerate(results):
-        for t in range(T):
-            prices[i, t] = res[t].price
-            providers[i, t] = res[t].providers
-            revenues[i, t] = res[t].demand_served * res[t].servicePrice
+def load_store(store: str, metrics: Sequence[str] = RESULT_FIELDS) -> BatchResult:
+    """Read-only memmap BatchResult over a transport='memmap' store recorded with `metrics`"""
+    data = np.load(store, mmap_mode='r')
+    return BatchResult(data.shape[1], data.shape[2], data, metrics=metrics)
+
+def _first_path_of(previous: Union[BatchResult, StreamingAggregator], base_params: SimulationParams) -> int:
+    # Where previous starts in base_params' seed stream; refuses results of other params/seeds
+    if previous.origin is None:
+        raise ValueError("Previous result has no recorded seed-stream position; it cannot be extended")
+    key, first_path = previous.origin
+    if key != stream_key(base_params):
+        raise ValueError("Previous result was run with different params or seed than base_params")
+    return first_path
+
+def extend_monte_carlo(base_params: SimulationParams, previous: BatchResult, n_more: int,
+                       cache: Optional[ResultCache] = None, **kwargs) -> BatchResult:
+    """Add n_more paths to a stored run_monte_carlo result of base_params.
+    
+    The new paths continue the seed stream where `previous` stopped, so the
+    combined result is identical to run_monte_carlo(base_params,
+    previous.n_sims + n_more, first_path=<previous's first path>). previous
+    must carry its origin (run_monte_carlo results do) from the same
+    params and seed. Other keyword arguments go to run_monte_carlo.
+    """
+    first_path = _first_path_of(previous, base_params)
+    n_total = previous.n_sims + n_more
+    backend = kwargs.get('backend', 'numpy')
+    if cache is not None:
+        cached = cache.get_paths(base_params, n_total, first_path=first_path, metrics=previous.metrics, backend=backend)
+        if cached is not None:
+            print(f"Loaded {n_total} Monte Carlo Simulations from cache")
+            cached.origin = previous.origin
+            return cached
             
-    # Calculate Percentiles
-    agg = {
-        'price': {
-            'mean': np.mean(prices, axis=0),
-            'p05': np.percentile(prices, 5, axis=0),
-            'p95': np.percentile(prices, 95, axis=0)
-        },
-        'providers': {
-            'mean': np.mean(providers, axis=0),
-            'p05': np.percentile(providers, 5, axis=0),
-            'p95': np.percentile(providers, 95, axis=0)
-        },
-        'revenue': {
-            'mean': np.mean(revenues, axis=0) * 52, # Annualized
-            'p05': np.percentile(revenues, 5, axis=0) * 52,
-            'p95': np.percentile(revenues, 95, axis=0) * 52
-        }
-    }
+    more = run_monte_carlo(base_params, n_more, first_path=first_path + previous.n_sims, metrics=previous.metrics, **kwargs)
+    combined = BatchResult(n_total, base_params.T, metrics=previous.metrics, origin=previous.origin)
+    combined.data[:, :previous.n_sims] = previous.data
+    combined.data[:, previous.n_sims:] = more.data
+    
+    if cache is not None:
+        cache.put_paths(base_params, n_total, combined, first_path=first_path, backend=backend)
+    return combined
+
+def _init_reducing_worker(params: SimulationParams, reducers: list, backend: str = 'numpy'):
+    """Pool initializer for run_monte_carlo_reduced: params and empty reducer templates, sent once"""
+    _worker['params'] = params
+    _worker['reducers'] = reducers
+    _worker['engine'] = ENGINES[backend]
+
+def reduce_simulation_chunk(bounds: Tuple[int, int]) -> list:
+    """Wrapper for multiprocessing: runs paths [start, stop) into fresh copies of the reducers"""
+    start, stop = bounds
+    params = _worker['params']
+    reducers = copy.deepcopy(_worker['reducers'])
+    for reducer in reducers:
+        # Copies share the template's RNG state; chunks must not share compaction offsets
+        reducer.reseed(start)
+    _worker['engine'](params, path_seeds(params.seed, start, stop), metrics=(), reducers=reducers)
+    return reducers
+
+def run_monte_carlo_reduced(base_params: SimulationParams, reducers: Sequence, n_sims: int = 1000,
+                            chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                            backend: Literal['numpy', 'jit'] = 'numpy', first_path: int = 0) -> Sequence:
+    """Run n_sims paths straight into online reducers (streaming.WeeklyMoments etc.).
+    
+    reducers should start empty. Every worker feeds copies of them week by
+    week inside the engine, recording no trajectories, and the parent
+    merges each chunk's reducers into the given ones, which are returned.
+    first_path offsets the seed stream as in run_monte_carlo.
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+    print(f"Starting {n_sims} Monte Carlo Simulations (reduced in-engine)...")
+    start_time = time.time()
+    
+    processes = processes or cpu_count()
+    with Pool(processes=processes, initializer=_init_reducing_worker, initargs=(base_params, list(reducers), backend)) as pool:
+        tasks = [(first_path + start, first_path + stop) for start, stop in chunk_bounds(n_sims, processes, chunk_size)]
+        for parts in pool.imap_unordered(reduce_simulation_chunk, tasks):
+            for reducer, part in zip(reducers, parts):
+                reducer.merge(part)
+                
+    duration = time.time() - start_time
+    print(f"Completed in {duration:.2f} seconds ({n_sims / duration:.0f} sims/sec)")
+    
+    return reducers
+
+def run_monte_carlo_streaming(base_params: SimulationParams, n_sims: int = 1000,
+                              chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                              backend: Literal['numpy', 'jit'] = 'numpy', first_path: int = 0) -> StreamingAggregator:
+    """run_monte_carlo + aggregate_results in constant memory.
     
+    Each worker reduces its chunk to a StreamingAggregator; the parent merges
+    them as they finish, so no path arrays outlive a chunk. first_path offsets
+    the seed stream as in run_monte_carlo.
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+    print(f"Starting {n_sims} Monte Carlo Simulations (streaming)...")
+    start_time = time.time()
+    
+    processes = processes or cpu_count()
+    agg = StreamingAggregator(base_params.T)
+    with Pool(processes=processes, initializer=_init_worker, initargs=(base_params, backend)) as pool:
+        tasks = [(first_path + start, first_path + stop) for start, stop in chunk_bounds(n_sims, processes, chunk_size)]
+        for part in pool.imap_unordered(aggregate_simulation_chunk, tasks):
+            agg.merge(part)
+            
+    duration = time.time() - start_time
+    print(f"Completed in {duration:.2f} seconds ({n_sims / duration:.0f} sims/sec)")
+    
+    agg.origin = (stream_key(base_params), first_path)
+    return agg
+
+def extend_streaming(base_params: SimulationParams, agg: StreamingAggregator, n_more: int, **kwargs) -> StreamingAggregator:
+    """Merge n_more further paths into a run_monte_carlo_streaming aggregate (in place).
+    
+    The paths added continue the seed stream from agg's origin plus
+    agg.n_sims, so they are exactly those a single run of the combined size
+    would have used. Means and variances match that run to rounding;
+    quantiles to the sketch's error. agg must come from the same params and
+    seed (run_monte_carlo_streaming and run_monte_carlo_adaptive record it).
+    """
+    first_path = _first_path_of(agg, base_params)
+    agg.merge(run_monte_carlo_streaming(base_params, n_more, first_path=first_path + agg.n_sims, **kwargs))
+    return agg
+
+@dataclass
+class AdaptiveRun:
+    aggregate: StreamingAggregator
+    converged: bool
+    max_rel_error: float  # worst SE / |estimate| over series, weeks and stats
+    seconds: float
+
+def run_monte_carlo_adaptive(base_params: SimulationParams, rel_tol: float = 0.01, atol: float = 0.0,
+                             batch_size: int = 1000, max_sims: int = 100_000, max_seconds: Optional[float] = None,
+                             chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                             backend: Literal['numpy', 'jit'] = 'numpy') -> AdaptiveRun:
+    """Run batches of paths until the reported statistics have converged.
+    
+    After each batch the per-week price, providers and revenue mean and
+    p05/p95 must all satisfy SE <= rel_tol * |estimate| + atol (see
+    StreamingAggregator.standard_errors). Stops early at max_sims paths or
+    once max_seconds have elapsed. Batches continue one seed stream on one
+    pool, so the aggregate equals a run_monte_carlo_streaming of the same size.
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+    print(f"Starting adaptive Monte Carlo (rel_tol={rel_tol}, up to {max_sims} sims)...")
+    start_time = time.time()
+    
+    processes = processes or cpu_count()
+    agg = StreamingAggregator(base_params.T)
+    agg.origin = (stream_key(base_params), 0)
+    converged = False
+    worst = np.inf
+    with Pool(processes=processes, initializer=_init_worker, initargs=(base_params, backend)) as pool:
+        while agg.n_sims < max_sims:
+            first = agg.n_sims
+            n = min(batch_size, max_sims - first)
+            tasks = [(first + start, first + stop) for start, stop in chunk_bounds(n, processes, chunk_size)]
+            for part in pool.imap_unordered(aggregate_simulation_chunk, tasks):
+                agg.merge(part)
+                
+            estimates = agg.result()
+            worst = 0.0
+            within_tolerance = True
+            with np.errstate(divide='ignore', invalid='ignore'):
+                for name, errors in agg.standard_errors().items():
+                    for stat, se in errors.items():
+                        estimate = np.abs(estimates[name][stat])
+                        within_tolerance &= bool(np.all(se <= rel_tol * estimate + atol))
+                        worst = max(worst, float(np.nanmax(se / estimate)))
+            print(f"  {agg.n_sims} sims: worst relative SE {worst:.4f}")
+            
+            if within_tolerance:
+                converged = True
+                break
+            if max_seconds is not None and time.time() - start_time >= max_seconds:
+                break
+                
+    duration = time.time() - start_time
+    print(f"{'Converged' if converged else 'Stopped'} after {agg.n_sims} sims in {duration:.2f} seconds")
+    
+    return AdaptiveRun(agg, converged, worst, duration)
+
+def run_scenarios(scenarios: Dict[str, SimulationParams], n_sims: int = 1000,
+                  chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                  backend: Literal['numpy', 'jit'] = 'numpy',
+                  metrics: Sequence[str] = RESULT_FIELDS) -> Iterator[Tuple[str, BatchResult]]:
+    """Run several scenarios through one long-lived pool.
+    
+    Every scenario's chunks are queued up front, scenario by scenario, so
+    workers move straight on to the next scenario instead of idling while
+    the last chunks of the previous one finish. Yields (name, result) as soon
+    as all of a scenario's paths are in, roughly in submission order. Each
+    result is identical to run_monte_carlo(params, n_sims).
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+        
+    processes = processes or cpu_count()
+    results = {name: BatchResult(n_sims, params.T, metrics=metrics, origin=(stream_key(params), 0))
+               for name, params in scenarios.items()}
+    pending = {name: n_sims for name in scenarios}
+    tasks = [(name, start, stop) for name in scenarios for start, stop in chunk_bounds(n_sims, processes, chunk_size)]
+    
+    with Pool(processes=processes, initializer=_init_scenarios_worker, initargs=(scenarios, backend, tuple(metrics))) as pool:
+        for name, start, chunk in pool.imap_unordered(run_scenario_chunk, tasks):
+            results[name].data[:, start:start + chunk.shape[1]] = chunk
+            pending[name] -= chunk.shape[1]
+            if pending[name] == 0:
+                yield name, results.pop(name)
+
+def run_paired_comparison(scenarios: Dict[str, SimulationParams], baseline: str, n_sims: int = 200,
+                          chunk_size: Optional[int] = None, processes: Optional[int] = None,
+                          backend: Literal['numpy', 'jit'] = 'numpy') -> PairedAggregator:
+    """Common-random-numbers comparison of several scenarios against a baseline.
+    
+    Path i of every scenario is driven by the same noise block, drawn from
+    the baseline's seed stream. When all scenarios share the baseline's
+    investor unlock week the baseline paths are identical to a plain
+    run_monte_carlo run; otherwise a block with a price shock in every week
+    is drawn so each scenario can consume its own unlock week.
+    """
+    if backend not in ENGINES:
+        raise ValueError(f"Unknown backend: {backend}")
+    base_params = scenarios[baseline]
+    if any(p.T != base_params.T for p in scenarios.values()):
+        raise ValueError("Paired scenarios must share the same horizon T")
+    noise_params = base_params
+    if any(p.investorUnlockWeek != base_params.investorUnlockWeek for p in scenarios.values()):
+        noise_params = replace(base_params, investorUnlockWeek=-1)
+        
+    print(f"Starting {n_sims} paired Monte Carlo Simulations x {len(scenarios)} scenarios...")
+    start_time = time.time()
+    
+    processes = processes or cpu_count()
+    agg = PairedAggregator(list(scenarios), baseline, base_params.T)
+    with Pool(processes=processes, initializer=_init_comparison_worker,
+              initargs=(scenarios, baseline, noise_params, backend)) as pool:
+        for part in pool.imap_unordered(compare_simulation_chunk, chunk_bounds(n_sims, processes, chunk_size)):
+            agg.merge(part)
+            
+    duration = time.time() - start_time
+    print(f"Completed in {duration:.2f} seconds ({n_sims * len(scenarios) / duration:.0f} sims/sec)")
+    
+    return agg
+
+def aggregate_results(results: Union[BatchResult, Sequence[Sequence[SimResult]]], T: int, max_bytes: int = 1 << 30,
+                      quantiles: Sequence[float] = (5, 95)):
+    """Per-week mean and percentiles (p05/p95 by default) of price, providers
+    and annualized revenue.
+    
+    quantiles are percentiles in [0, 100], e.g. (1, 5, 25, 50, 75, 95, 99)
+    for a fan chart; each becomes a 'pXX' entry. All series and all
+    percentiles of a block come from one partition of a stacked
+    (series, n_sims, weeks) array, so extra percentiles cost no extra sort.
+    
+    Weeks are reduced in blocks that keep the working set under about
+    max_bytes, so memmap-backed results (transport='memmap', artifacts)
+    stream from disk instead of being loaded whole. Every week is reduced
+    over all paths at once, so percentiles do not depend on the block size;
+    means agree across block sizes to rounding only, since numpy's
+    summation order follows the block's shape.
+    """
+    if not isinstance(results, BatchResult):
+        results = BatchResult.from_results(results, T)
+        
+    names = list(REPORT_SCALE)
+    labels = [f"p{p:02g}" for p in quantiles]
+    scale = np.array([REPORT_SCALE[name] for name in names])[:, None]
+    agg = {name: {stat: np.empty(T) for stat in ['mean', *labels]} for name in names}
+    # One stacked (series, n_sims, weeks) float64 block, partitioned in place, plus one temporary
+    step = max(1, max_bytes // ((len(names) + 1) * 8 * max(1, results.n_sims)))
+    for w0 in range(0, T, step):
+        weeks = slice(w0, min(T, w0 + step))
+        
+        # Extract time series for key metrics
+        # Shape: (series, n_sims, weeks)
+        stacked = np.empty((len(names), results.n_sims, weeks.stop - w0))
+        for s, name in enumerate(names):
+            stacked[s] = series_values(name, lambda metric: results.metric(metric)[:, weeks])
+        
+        # Calculate Percentiles (revenue is annualized)
+        means = stacked.mean(axis=1) * scale
+        bands = np.quantile(stacked, np.asarray(quantiles, dtype=float) / 100, axis=1, overwrite_input=True) * scale
+        for s, name in enumerate(names):
+            agg[name]['mean'][weeks] = means[s]
+            for label, values in zip(labels, bands[:, s]):
+                agg[name][label][weeks] = values
+                
     return agg
 
 if __name__ == "__main__":
@@ -89,9 +547,10 @@ if __name__ == "__main__":
         revenueStrategy='burn'
     )
     
-    # Run
-    sim_results = run_monte_carlo(params, n_sims=1000)
-    stats = aggregate_results(sim_results, params.T)
+    # Run, reducing in-engine: only the per-week statistics are ever held
+    reducers = report_reducers(params.T)
+    run_monte_carlo_reduced(params, [r for pair in reducers.values() for r in pair], n_sims=1000)
+    stats = {name: {**moments.result(), **bands.result()} for name, (moments, bands) in reducers.items()}
     
     # Report Final Week Stats
     final_price = stats['price']['mean'][-1]
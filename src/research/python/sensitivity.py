@@ -0,0 +1,121 @@
+import warnings
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, fields
+from scipy.stats import qmc
+from typing import Dict, Literal, Optional, Sequence, Tuple
+from engine import SimulationParams
+from sweep import STRUCTURAL_FIELDS, run_sweep
+
+# Week-T metrics analysed by default
+SENSITIVITY_OUTPUTS = ('price', 'providers', 'solvencyScore')
+
+# Continuous params: every numeric field that run_sweep can vectorize
+CONTINUOUS_FIELDS = tuple(f.name for f in fields(SimulationParams) if f.name not in STRUCTURAL_FIELDS)
+
+# Shares of supply/tokens, capped at 1 by default_bounds
+_FRACTION_FIELDS = {'burnPct', 'investorSellPct'}
+
+def default_bounds(base_params: SimulationParams, spread: float = 0.5,
+                   names: Sequence[str] = CONTINUOUS_FIELDS) -> Dict[str, Tuple[float, float]]:
+    """base value -/+ spread (relative) for each named field; fields at 0 are left out"""
+    bounds = {}
+    for name in names:
+        value = float(getattr(base_params, name))
+        if value == 0:
+            continue
+        lo, hi = sorted((value * (1 - spread), value * (1 + spread)))
+        if name in _FRACTION_FIELDS:
+            hi = min(hi, 1.0)
+        bounds[name] = (lo, hi)
+    return bounds
+
+def sample_design(bounds: Dict[str, Tuple[float, float]], n: int, method: Literal['sobol', 'lhs'] = 'sobol',
+                  seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Two independent (n, d) sample matrices A and B over the bounds.
+
+    Both come from one 2d-dimensional design (scrambled Sobol or Latin
+    hypercube), split column-wise. Sobol designs want n a power of two.
+    """
+    d = len(bounds)
+    if method == 'sobol':
+        unit = qmc.Sobol(2 * d, scramble=True, seed=seed).random(n)
+    elif method == 'lhs':
+        unit = qmc.LatinHypercube(2 * d, seed=seed).random(n)
+    else:
+        raise ValueError(f"Unknown sampling method: {method}")
+    lo, hi = np.array(list(bounds.values())).T
+    return qmc.scale(unit[:, :d], lo, hi), qmc.scale(unit[:, d:], lo, hi)
+
+def _sobol_estimates(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # f_a, f_b: (..., N); f_ab: (..., d, N). Saltelli (2010) first order, Jansen total.
+    # Outputs are centered first (unbiased, and far steadier for skewed metrics);
+    # an output that never varies (beyond rounding) gets NaN indices
+    both = np.concatenate([f_a, f_b], axis=-1)
+    center = both.mean(axis=-1, keepdims=True)
+    f_a, f_b, f_ab = f_a - center, f_b - center, f_ab - center[..., None]
+    variance = both.var(axis=-1, keepdims=True)
+    variance = np.where(variance > (1e-12 * center) ** 2, variance, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        first = (f_b[..., None, :] * (f_ab - f_a[..., None, :])).mean(axis=-1) / variance
+        total = 0.5 * ((f_a[..., None, :] - f_ab) ** 2).mean(axis=-1) / variance
+    return first, total
+
+@dataclass
+class SensitivityResult:
+    indices: pd.DataFrame  # (output, param) -> S1, S1_lo, S1_hi, ST, ST_lo, ST_hi
+    design: pd.DataFrame   # every evaluated point, with its role ('A', 'B' or 'AB:<param>')
+    n_evaluations: int
+
+def sobol_indices(base_params: SimulationParams, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                  n_samples: int = 256, n_sims: int = 64, method: Literal['sobol', 'lhs'] = 'sobol',
+                  outputs: Sequence[str] = SENSITIVITY_OUTPUTS, n_bootstrap: int = 500, confidence: float = 0.95,
+                  seed: int = 0, processes: Optional[int] = None) -> SensitivityResult:
+    """First-order and total Sobol indices of week-T metrics over continuous params.
+
+    Uses the Saltelli design: sample matrices A and B (see sample_design)
+    plus, for each of the d params, A with that column taken from B, i.e.
+    n_samples * (d + 2) points. All of them run as one run_sweep, so every
+    point sees the same n_sims noise paths and the model output (the mean
+    over paths at week T) is a smooth function of the params.
+
+    Confidence intervals are percentile bootstraps over the n_samples rows.
+    bounds defaults to default_bounds(base_params).
+    """
+    bounds = dict(bounds) if bounds is not None else default_bounds(base_params)
+    structural = set(bounds) & set(STRUCTURAL_FIELDS)
+    if structural:
+        raise ValueError(f"Not continuous params: {sorted(structural)}")
+    names = list(bounds)
+    d = len(names)
+
+    a, b = sample_design(bounds, n_samples, method, seed)
+    blocks = [a, b] + [np.where(np.arange(d) == i, b, a) for i in range(d)]
+    roles = ['A', 'B'] + [f"AB:{name}" for name in names]
+    design = pd.DataFrame(np.concatenate(blocks), columns=names)
+    design.insert(0, 'role', np.repeat(roles, n_samples))
+
+    sweep = run_sweep(base_params, design[names].to_dict('records'), n_sims=n_sims, metrics=list(outputs),
+                      processes=processes)
+    # (outputs, 2 + d, N): path mean at the final week of every point
+    values = sweep.data[:, :, :, -1].mean(axis=2).reshape(len(outputs), d + 2, n_samples)
+    for name, v in zip(outputs, values):
+        design[name] = v.ravel()
+    f_a, f_b, f_ab = values[:, 0], values[:, 1], values[:, 2:]
+
+    first, total = _sobol_estimates(f_a, f_b, f_ab)
+    rows = np.random.default_rng(seed).integers(n_samples, size=(n_bootstrap, n_samples))
+    boot_first, boot_total = _sobol_estimates(f_a[:, rows], f_b[:, rows], np.moveaxis(f_ab[:, :, rows], 1, 2))
+    tail = 100 * (1 - confidence) / 2
+    with warnings.catch_warnings():
+        # Resamples without variance are NaN and skipped; all-NaN outputs stay NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        first_lo, first_hi = np.nanpercentile(boot_first, [tail, 100 - tail], axis=1)
+        total_lo, total_hi = np.nanpercentile(boot_total, [tail, 100 - tail], axis=1)
+
+    index = pd.MultiIndex.from_product([list(outputs), names], names=['output', 'param'])
+    indices = pd.DataFrame({
+        'S1': first.ravel(), 'S1_lo': first_lo.ravel(), 'S1_hi': first_hi.ravel(),
+        'ST': total.ravel(), 'ST_lo': total_lo.ravel(), 'ST_hi': total_hi.ravel(),
+    }, index=index)
+    return SensitivityResult(indices, design, len(design))
@@ -0,0 +1,418 @@
+import numpy as np
+from typing import Callable, Dict, List, Sequence
+from engine import BatchResult, RESULT_FIELDS
+
+# Series reported by aggregate_results / the research exports, with the factor
+# applied on output (revenue is annualized from weekly values)
+REPORT_SCALE = {'price': 1.0, 'providers': 1.0, 'revenue': 52.0}
+
+# Engine metrics report_series reads; runs that are only aggregated record just these
+REPORT_METRICS = ('price', 'providers', 'demand_served', 'servicePrice')
+
+# Series derived from several engine metrics; every RESULT_FIELDS name is a series of its own
+DERIVED_SERIES = {'revenue': ('demand_served', 'servicePrice')}
+
+def series_inputs(series: str) -> tuple:
+    """Engine metrics a series is computed from"""
+    if series in DERIVED_SERIES:
+        return DERIVED_SERIES[series]
+    if series not in RESULT_FIELDS:
+        raise ValueError(f"Unknown series: {series!r}")
+    return (series,)
+
+def series_values(series: str, get: Callable[[str], np.ndarray]) -> np.ndarray:
+    """A series from get(metric): BatchResult.metric for paths, a week dict's lookup for one week"""
+    if series == 'revenue':
+        return get('demand_served') * get('servicePrice')
+    return get(series)
+
+def report_series(batch: BatchResult) -> Dict[str, np.ndarray]:
+    """(n_sims, T) weekly arrays for each reported series, before scaling"""
+    return {name: series_values(name, batch.metric) for name in REPORT_SCALE}
+
+class RunningMoments:
+    """Per-week count/mean/M2, updated in batches and mergeable (Chan et al.)."""
+
+    def __init__(self, T: int):
+        self.count = 0
+        self.mean = np.zeros(T)
+        self.m2 = np.zeros(T)
+
+    def update(self, values: np.ndarray):
+        # values: (n, T) batch of paths
+        n = values.shape[0]
+        if n == 0:
+            return
+        batch_mean = values.mean(axis=0)
+        batch_m2 = ((values - batch_mean) ** 2).sum(axis=0)
+        self._combine(n, batch_mean, batch_m2)
+
+    def merge(self, other: 'RunningMoments'):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+
+    def _combine(self, n: int, mean: np.ndarray, m2: np.ndarray):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+
+    @property
+    def variance(self) -> np.ndarray:
+        # Sample variance (ddof=1)
+        if self.count < 2:
+            return np.full_like(self.mean, np.nan)
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.variance)
+
+class QuantileSketch:
+    """KLL-style mergeable quantile sketch over T weekly columns.
+
+    Every path contributes one value to each week, so all T columns hold the
+    same number of items per level and are compacted in lockstep: a level
+    that overflows is sorted per column and every other item (random offset)
+    is promoted with doubled weight. Memory is O(k * T) regardless of how many
+    paths are added; rank error shrinks as O(1/k). Until the first compaction
+    the sketch is exact and quantiles match np.quantile.
+    """
+
+    def __init__(self, T: int, k: int = 256, seed: int = 0):
+        self.T = T
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty((0, T))]
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        """Restart the compaction coin flips from seed (anything default_rng accepts)"""
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        # Lower levels shrink geometrically (c = 2/3) as the sketch grows
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray):
+        # values: (n, T) batch of paths
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += values.shape[0]
+        self._compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        if other.T != self.T:
+            raise ValueError(f"Cannot merge sketches over {other.T} and {self.T} weeks")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty((0, self.T)))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.shape[0] > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty((0, self.T)))
+                items = np.sort(items, axis=0)
+                # An odd item out stays behind so the total weight is preserved
+                n_pairs = items.shape[0] // 2
+                offset = self._rng.integers(2)
+                promoted = items[offset:2 * n_pairs:2]
+                self.levels[h] = items[2 * n_pairs:]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+            h += 1
+
+    def quantile(self, q) -> np.ndarray:
+        """Quantiles q in [0, 1]; returns (T,) for scalar q, else (len(q), T)."""
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.count == 0:
+            out = np.full((len(qs), self.T), np.nan)
+        elif len(self.levels) == 1:
+            out = np.quantile(self.levels[0], qs, axis=0)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+            order = np.argsort(items, axis=0)
+            sorted_items = np.take_along_axis(items, order, axis=0)
+            cum = np.cumsum(weights[order], axis=0)
+            # Midpoint ranks of each item's weight, normalized to [0, 1]
+            ranks = (cum - 0.5 * weights[order]) / cum[-1]
+            out = np.empty((len(qs), self.T))
+            for t in range(self.T):
+                out[:, t] = np.interp(qs, ranks[:, t], sorted_items[:, t])
+        return out[0] if np.ndim(q) == 0 else out
+
+class WeeklyReducer:
+    """Online reduction of one series, fed a week at a time by the engine.
+
+    simulate_batch(..., reducers=[...]) calls begin(n) when a batch of n
+    paths starts and observe(t, week) after each week t, so the reduction
+    never needs the trajectories. series is an engine metric or a derived
+    series ('revenue'); `metrics` lists the engine metrics it reads.
+    Reducers of the same series and horizon built on different path chunks
+    combine with merge(). result() is in report units (REPORT_SCALE).
+    """
+
+    def __init__(self, series: str, T: int):
+        self.metrics = series_inputs(series)
+        self.series = series
+        self.T = T
+        self.scale = REPORT_SCALE.get(series, 1.0)
+
+    def begin(self, n: int):
+        pass
+
+    def reseed(self, seed: int):
+        """Give a copy its own random state (e.g. one per path chunk); a no-op for exact reducers"""
+        pass
+
+    def observe(self, t: int, week: Dict[str, np.ndarray]):
+        self.update(t, series_values(self.series, week.__getitem__))
+
+    def update(self, t: int, values: np.ndarray):
+        # values: (n,) series values of week t, one per path
+        raise NotImplementedError
+
+    def _check(self, other: 'WeeklyReducer'):
+        if (type(other), other.series, other.T) != (type(self), self.series, self.T):
+            raise ValueError(f"Cannot merge {type(other).__name__}({other.series!r}, T={other.T}) "
+                             f"into {type(self).__name__}({self.series!r}, T={self.T})")
+
+class WeeklyMoments(WeeklyReducer):
+    """Per-week count/mean/M2 and min/max of a series, merged with Chan's update."""
+
+    def __init__(self, series: str, T: int):
+        super().__init__(series, T)
+        self.count = np.zeros(T, dtype=np.int64)
+        self.mean = np.zeros(T)
+        self.m2 = np.zeros(T)
+        self.min = np.full(T, np.inf)
+        self.max = np.full(T, -np.inf)
+
+    def update(self, t: int, values: np.ndarray):
+        if len(values) == 0:
+            return
+        mean = values.mean()
+        self._combine(t, len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+
+    def merge(self, other: 'WeeklyMoments'):
+        self._check(other)
+        self._combine(slice(None), other.count, other.mean, other.m2, other.min, other.max)
+
+    def _combine(self, t, n, mean, m2, lo, hi):
+        count = self.count[t]
+        total = np.maximum(count + n, 1)
+        delta = mean - self.mean[t]
+        self.mean[t] = self.mean[t] + delta * (n / total)
+        self.m2[t] = self.m2[t] + m2 + delta ** 2 * (count * n / total)
+        self.min[t] = np.minimum(self.min[t], lo)
+        self.max[t] = np.maximum(self.max[t], hi)
+        self.count[t] = count + n
+
+    @property
+    def variance(self) -> np.ndarray:
+        # Sample variance (ddof=1); NaN for weeks with fewer than two paths
+        return np.where(self.count > 1, self.m2 / np.maximum(self.count - 1, 1), np.nan)
+
+    def result(self) -> Dict[str, np.ndarray]:
+        """{'mean', 'std', 'min', 'max'} per week; NaN for weeks not observed"""
+        seen = self.count > 0
+        return {
+            'mean': np.where(seen, self.mean, np.nan) * self.scale,
+            'std': np.sqrt(self.variance) * self.scale,
+            'min': np.where(seen, self.min, np.nan) * self.scale,
+            'max': np.where(seen, self.max, np.nan) * self.scale,
+        }
+
+class WeeklyQuantiles(WeeklyReducer):
+    """Per-week quantiles of a series: one single-column QuantileSketch per week."""
+
+    def __init__(self, series: str, T: int, k: int = 256, seed: int = 0):
+        super().__init__(series, T)
+        self.sketches = [QuantileSketch(1, k) for _ in range(T)]
+        self.reseed(seed)
+
+    def reseed(self, seed: int):
+        for t, sketch in enumerate(self.sketches):
+            sketch.reseed((seed, t))
+
+    def update(self, t: int, values: np.ndarray):
+        self.sketches[t].update(values[:, None])
+
+    def merge(self, other: 'WeeklyQuantiles'):
+        self._check(other)
+        for mine, theirs in zip(self.sketches, other.sketches):
+            mine.merge(theirs)
+
+    def quantile(self, q) -> np.ndarray:
+        """Quantiles q in [0, 1]; returns (T,) for scalar q, else (len(q), T)."""
+        out = np.hstack([sketch.quantile(np.atleast_1d(q)) for sketch in self.sketches])
+        return out[0] if np.ndim(q) == 0 else out
+
+    def result(self, quantiles: Sequence[float] = (5, 95)) -> Dict[str, np.ndarray]:
+        """{'pXX': values per week} for each percentile in quantiles"""
+        qs = self.quantile(np.asarray(quantiles, dtype=float) / 100)
+        return {f"p{p:02g}": values * self.scale for p, values in zip(quantiles, qs)}
+
+class FirstCrossing(WeeklyReducer):
+    """Distribution of the first week each path's series crosses a threshold.
+
+    below=True counts the first week at or below threshold (e.g. price
+    collapse), below=False the first at or above it. Paths of a batch must
+    be observed week by week from the week they begin.
+    """
+
+    def __init__(self, series: str, T: int, threshold: float, below: bool = True):
+        super().__init__(series, T)
+        self.threshold = threshold
+        self.below = below
+        self.count = 0
+        self.hits = np.zeros(T, dtype=np.int64)  # paths first crossing in week t
+        self._pending = np.zeros(0, dtype=bool)
+
+    def begin(self, n: int):
+        self.count += n
+        self._pending = np.ones(n, dtype=bool)
+
+    def update(self, t: int, values: np.ndarray):
+        crossed = self._pending & ((values <= self.threshold) if self.below else (values >= self.threshold))
+        self.hits[t] += np.count_nonzero(crossed)
+        self._pending &= ~crossed
+
+    def merge(self, other: 'FirstCrossing'):
+        self._check(other)
+        if (other.threshold, other.below) != (self.threshold, self.below):
+            raise ValueError("Cannot merge crossings of different thresholds")
+        self.count += other.count
+        self.hits += other.hits
+
+    def result(self) -> Dict[str, np.ndarray]:
+        """{'cdf': share of paths crossed by each week, 'never': share never crossed,
+        'mean_week': mean first-crossing week of the paths that crossed}"""
+        crossed = self.hits.sum()
+        return {
+            'cdf': np.cumsum(self.hits) / max(self.count, 1),
+            'never': 1.0 - crossed / max(self.count, 1),
+            'mean_week': (self.hits @ np.arange(self.T)) / crossed if crossed else np.nan,
+        }
+
+def report_reducers(T: int, k: int = 256) -> Dict[str, tuple]:
+    """{series: (WeeklyMoments, WeeklyQuantiles)} for every reported series"""
+    return {name: (WeeklyMoments(name, T), WeeklyQuantiles(name, T, k)) for name in REPORT_SCALE}
+
+class StreamingAggregator:
+    """Constant-memory replacement for aggregate_results.
+
+    Feed path batches with add() as they finish; per-week mean/variance are
+    exact, p05/p95 come from QuantileSketch. Aggregators built on different
+    processes or machines combine with merge(). origin is (cache.stream_key,
+    first path) of the seed-stream range aggregated, when known.
+    """
+
+    def __init__(self, T: int, k: int = 256, seed: int = 0):
+        self.T = T
+        self.origin = None
+        self.moments = {name: RunningMoments(T) for name in REPORT_SCALE}
+        self.sketches = {name: QuantileSketch(T, k, seed) for name in REPORT_SCALE}
+
+    @property
+    def n_sims(self) -> int:
+        return self.moments['price'].count
+
+    def add(self, batch: BatchResult):
+        for name, values in report_series(batch).items():
+            values = values[:, :self.T]
+            self.moments[name].update(values)
+            self.sketches[name].update(values)
+
+    def merge(self, other: 'StreamingAggregator'):
+        for name in REPORT_SCALE:
+            self.moments[name].merge(other.moments[name])
+            self.sketches[name].merge(other.sketches[name])
+
+    def standard_errors(self, quantiles: Sequence[float] = (5, 95)) -> Dict[str, Dict[str, np.ndarray]]:
+        """Per-week standard errors of the mean and of each pXX, in result() units.
+
+        The quantile SE uses the order-statistic (binomial) approximation:
+        half the spread between quantiles p -/+ sqrt(p(1-p)/n).
+        """
+        n = self.n_sims
+        errors = {}
+        for name, scale in REPORT_SCALE.items():
+            errors[name] = {'mean': self.moments[name].std / np.sqrt(n) * scale}
+            for p in quantiles:
+                q = p / 100
+                s = np.sqrt(q * (1 - q) / n)
+                lo, hi = self.sketches[name].quantile([max(0.0, q - s), min(1.0, q + s)])
+                errors[name][f"p{p:02g}"] = 0.5 * (hi - lo) * scale
+        return errors
+
+    def result(self, quantiles: Sequence[float] = (5, 95)) -> Dict[str, Dict[str, np.ndarray]]:
+        """Same layout as aggregate_results: {series: {'mean', 'std', 'pXX', ...}}"""
+        agg = {}
+        for name, scale in REPORT_SCALE.items():
+            qs = self.sketches[name].quantile(np.asarray(quantiles, dtype=float) / 100)
+            agg[name] = {'mean': self.moments[name].mean * scale, 'std': self.moments[name].std * scale}
+            for p, values in zip(quantiles, qs):
+                agg[name][f"p{p:02g}"] = values * scale
+        return agg
+
+class PairedAggregator:
+    """Per-week levels and paired deltas vs a baseline for scenarios run on
+    common random numbers (every scenario sees the same noise block, so path
+    i of each scenario differs only by its params).
+
+    Deltas are reduced path by path before averaging, which cancels the
+    shared sampling noise: the CI on a difference is far tighter than two
+    independent runs of the same size would give.
+    """
+
+    def __init__(self, scenarios: Sequence[str], baseline: str, T: int):
+        if baseline not in scenarios:
+            raise ValueError(f"Baseline {baseline!r} is not one of the scenarios")
+        self.scenarios = list(scenarios)
+        self.baseline = baseline
+        self.T = T
+        self.levels = {s: {name: RunningMoments(T) for name in REPORT_SCALE} for s in self.scenarios}
+        self.deltas = {s: {name: RunningMoments(T) for name in REPORT_SCALE} for s in self.scenarios}
+
+    @property
+    def n_sims(self) -> int:
+        return self.levels[self.baseline]['price'].count
+
+    def add(self, batches: Dict[str, BatchResult]):
+        # batches: one BatchResult per scenario, all simulated on the same noise block
+        series = {s: report_series(batches[s]) for s in self.scenarios}
+        base = series[self.baseline]
+        for s in self.scenarios:
+            for name, values in series[s].items():
+                self.levels[s][name].update(values[:, :self.T])
+                self.deltas[s][name].update((values - base[name])[:, :self.T])
+
+    def merge(self, other: 'PairedAggregator'):
+        for s in self.scenarios:
+            for name in REPORT_SCALE:
+                self.levels[s][name].merge(other.levels[s][name])
+                self.deltas[s][name].merge(other.deltas[s][name])
+
+    def result(self, z: float = 1.96) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+        """{scenario: {series: {'mean', 'delta_mean', 'delta_lo', 'delta_hi'}}}; z=1.96 gives 95% CIs"""
+        out = {}
+        for s in self.scenarios:
+            out[s] = {}
+            for name, scale in REPORT_SCALE.items():
+                delta = self.deltas[s][name]
+                half_width = z * np.sqrt(delta.variance / delta.count) if delta.count > 1 else np.zeros(self.T)
+                out[s][name] = {
+                    'mean': self.levels[s][name].mean * scale,
+                    'delta_mean': delta.mean * scale,
+                    'delta_lo': (delta.mean - half_width) * scale,
+                    'delta_hi': (delta.mean + half_width) * scale,
+                }
+        return out
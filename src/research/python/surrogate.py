@@ -0,0 +1,180 @@
+import itertools
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+from engine import SimulationParams, ENGINE_VERSION
+from cache import ResultCache
+from sensitivity import SENSITIVITY_OUTPUTS, default_bounds, sample_design
+from sweep import STRUCTURAL_FIELDS, run_sweep
+
+# Week-T statistics (over paths) the surrogate predicts for each output metric
+SURROGATE_STATS = ('mean', 'p05', 'p95')
+
+def _total_degree_exponents(d: int, degree: int) -> np.ndarray:
+    """(n_terms, d) exponents of every monomial of total degree <= degree"""
+    rows = []
+    for k in range(degree + 1):
+        for combo in itertools.combinations_with_replacement(range(d), k):
+            rows.append(np.bincount(np.array(combo, dtype=int), minlength=d))
+    return np.array(rows, dtype=int).reshape(-1, d)
+
+def _legendre(x: np.ndarray, degree: int) -> np.ndarray:
+    # x: (..., d) in [-1, 1] -> (..., d, degree + 1) Legendre polynomials P_0..P_degree
+    p = np.empty(x.shape + (degree + 1,))
+    p[..., 0] = 1.0
+    if degree > 0:
+        p[..., 1] = x
+    for k in range(1, degree):
+        p[..., k + 1] = ((2 * k + 1) * x * p[..., k] - k * p[..., k - 1]) / (k + 1)
+    return p
+
+def _basis(x: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    # x: (m, d) scaled inputs -> (m, n_terms) design matrix
+    p = _legendre(x, int(exponents.max(initial=0)))
+    return p[:, np.arange(x.shape[1]), exponents].prod(axis=-1)
+
+def _ridge_fit(phi: np.ndarray, y: np.ndarray, ridge: float = 1e-8) -> Tuple[np.ndarray, np.ndarray]:
+    """Coefficients and leave-one-out residuals (closed form, via the hat matrix)"""
+    gram = phi.T @ phi
+    gram[np.diag_indices_from(gram)] += ridge * np.trace(gram) / len(gram)
+    inverse = np.linalg.inv(gram)
+    coefficients = inverse @ phi.T @ y
+    leverage = np.einsum('ij,jk,ik->i', phi, inverse, phi)
+    residuals = (y - phi @ coefficients) / (1 - leverage)[:, None]
+    return coefficients, residuals
+
+@dataclass
+class Surrogate:
+    """Polynomial chaos emulator of week-T path statistics over continuous params.
+
+    Inputs are scaled from their training bounds to [-1, 1] and expanded in
+    a total-degree Legendre basis; predictions outside the bounds are
+    extrapolations. loo_rmse is the leave-one-out error of each target on
+    the training design, in the target's own units.
+    """
+    names: Tuple[str, ...]
+    lower: np.ndarray
+    upper: np.ndarray
+    base: np.ndarray  # value of each param in the base scenario, used for omitted inputs
+    exponents: np.ndarray
+    coefficients: np.ndarray  # (n_terms, n_targets)
+    targets: Tuple[str, ...]  # "metric/stat"
+    loo_rmse: np.ndarray
+    target_std: np.ndarray
+    engine_version: str = ENGINE_VERSION
+
+    def predict_batch(self, x: np.ndarray) -> np.ndarray:
+        """(m, d) param values in `names` order -> (m, n_targets) predictions"""
+        scaled = 2 * (np.asarray(x, dtype=float) - self.lower) / (self.upper - self.lower) - 1
+        return _basis(np.atleast_2d(scaled), self.exponents) @ self.coefficients
+
+    def predict(self, **values: float) -> Dict[str, Dict[str, float]]:
+        """{metric: {stat: value}} at one point; omitted params take their base value"""
+        unknown = set(values) - set(self.names)
+        if unknown:
+            raise ValueError(f"Not a surrogate input: {sorted(unknown)}")
+        x = np.array([values.get(name, b) for name, b in zip(self.names, self.base)])
+        out = {}
+        for target, value in zip(self.targets, self.predict_batch(x)[0]):
+            metric, stat = target.split('/')
+            out.setdefault(metric, {})[stat] = float(value)
+        return out
+
+    @property
+    def errors(self) -> Dict[str, Dict[str, float]]:
+        """Leave-one-out RMSE per {metric: {stat}}, in predicted units"""
+        out = {}
+        for target, rmse in zip(self.targets, self.loo_rmse):
+            metric, stat = target.split('/')
+            out.setdefault(metric, {})[stat] = float(rmse)
+        return out
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'names': np.array(self.names), 'lower': self.lower, 'upper': self.upper, 'base': self.base,
+            'exponents': self.exponents, 'coefficients': self.coefficients, 'targets': np.array(self.targets),
+            'loo_rmse': self.loo_rmse, 'target_std': self.target_std, 'engine_version': np.array(self.engine_version),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'Surrogate':
+        return cls(
+            tuple(str(n) for n in arrays['names']), arrays['lower'], arrays['upper'], arrays['base'],
+            arrays['exponents'], arrays['coefficients'], tuple(str(t) for t in arrays['targets']),
+            arrays['loo_rmse'], arrays['target_std'], str(arrays['engine_version']),
+        )
+
+def train_surrogate(base_params: SimulationParams, bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                    n_train: int = 512, n_sims: int = 200, max_degree: int = 3,
+                    outputs: Sequence[str] = SENSITIVITY_OUTPUTS, seed: int = 0,
+                    processes: Optional[int] = None) -> Surrogate:
+    """Fit a Surrogate on one run_sweep over a scrambled Sobol design.
+
+    Every training point runs n_sims common-random-numbers paths; the
+    targets are the mean, p05 and p95 over paths of each output at week T.
+    The polynomial degree (up to max_degree) with the lowest average
+    normalized leave-one-out error is kept.
+    """
+    bounds = dict(bounds) if bounds is not None else default_bounds(base_params)
+    structural = set(bounds) & set(STRUCTURAL_FIELDS)
+    if structural:
+        raise ValueError(f"Not continuous params: {sorted(structural)}")
+    names = tuple(bounds)
+    lower, upper = np.array(list(bounds.values()), dtype=float).T
+
+    x, _ = sample_design(bounds, n_train, 'sobol', seed)
+    sweep = run_sweep(base_params, [dict(zip(names, row)) for row in x], n_sims=n_sims, metrics=list(outputs),
+                      processes=processes)
+    final = sweep.data[:, :, :, -1]
+    p05, p95 = np.quantile(final, [0.05, 0.95], axis=2)
+    y = np.stack([final.mean(axis=2), p05, p95], axis=1).reshape(-1, n_train).T
+    targets = tuple(f"{metric}/{stat}" for metric in outputs for stat in SURROGATE_STATS)
+    target_std = y.std(axis=0)
+
+    scaled = 2 * (x - lower) / (upper - lower) - 1
+    best = None
+    for degree in range(1, max_degree + 1):
+        exponents = _total_degree_exponents(len(names), degree)
+        if len(exponents) >= n_train:
+            break
+        coefficients, residuals = _ridge_fit(_basis(scaled, exponents), y)
+        loo_rmse = np.sqrt((residuals ** 2).mean(axis=0))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score = np.nanmean(np.where(target_std > 0, loo_rmse / target_std, np.nan))
+        if best is None or score < best[0]:
+            best = (score, exponents, coefficients, loo_rmse)
+    if best is None:
+        raise ValueError(f"n_train={n_train} is too small for a linear fit in {len(names)} params")
+    _, exponents, coefficients, loo_rmse = best
+
+    base = np.array([float(getattr(base_params, name)) for name in names])
+    return Surrogate(names, lower, upper, base, exponents, coefficients, targets, loo_rmse, target_std)
+
+def load_or_train_surrogate(base_params: SimulationParams, cache: ResultCache,
+                            bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+                            n_train: int = 512, n_sims: int = 200, max_degree: int = 3,
+                            outputs: Sequence[str] = SENSITIVITY_OUTPUTS, seed: int = 0,
+                            processes: Optional[int] = None) -> Surrogate:
+    """train_surrogate, stored in and reloaded from the result cache.
+
+    The cache key covers the training setup and ENGINE_VERSION, so a model
+    trained on an older engine is never reused: bumping the engine version
+    retrains on next use.
+    """
+    bounds = dict(bounds) if bounds is not None else default_bounds(base_params)
+    setup = {'bounds': bounds, 'n_train': n_train, 'max_degree': max_degree, 'outputs': list(outputs),
+             'seed': seed, 'surrogate': 'legendre-pce'}
+    arrays = cache.get_model(base_params, n_sims, **setup)
+    if arrays is not None:
+        surrogate = Surrogate.from_arrays(arrays)
+        if surrogate.engine_version == ENGINE_VERSION:
+            return surrogate
+
+    print(f"Training surrogate ({n_train} points x {n_sims} sims, engine {ENGINE_VERSION})...")
+    start_time = time.time()
+    surrogate = train_surrogate(base_params, bounds, n_train, n_sims, max_degree, outputs, seed, processes)
+    print(f"Trained in {time.time() - start_time:.2f} seconds")
+
+    cache.put_model(base_params, n_sims, surrogate.to_arrays(), **setup)
+    return surrogate
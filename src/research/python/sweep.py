@@ -0,0 +1,174 @@
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool, cpu_count
+from dataclasses import fields, replace
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from engine import SimulationParams, simulate_batch, path_seeds, draw_random_block, RESULT_FIELDS
+from monte_carlo import chunk_bounds
+
+# Params that shape the simulation itself (horizon, random stream layout,
+# code paths taken) rather than entering it as numbers; points that differ in
+# any of them run in separate groups. Every other field is vectorized per path.
+STRUCTURAL_FIELDS = ('T', 'investorUnlockWeek', 'rewardLagWeeks', 'demandType', 'macro', 'emissionModel',
+                     'revenueStrategy', 'seed', 'nSims', 'growthCallEventWeek', 'growthCallEventPct')
+
+# Rough number of (point, path) rows simulated per task
+_TASK_ROWS = 4096
+
+_PARAM_FIELDS = {f.name for f in fields(SimulationParams)}
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of a {field: values} grid as a list of override dicts,
+    last field varying fastest."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+class SweepResult:
+    """Paths of every sweep point: data is (metrics, n_points, n_sims, T).
+
+    points[i] holds the overrides applied to the base params for point i.
+    """
+
+    def __init__(self, points: List[Dict[str, Any]], metrics: Sequence[str], n_sims: int, T: int):
+        self.points = points
+        self.metrics = tuple(metrics)
+        self._slots = {name: i for i, name in enumerate(self.metrics)}
+        self.data = np.empty((len(self.metrics), len(points), n_sims, T))
+
+    @property
+    def n_points(self) -> int:
+        return self.data.shape[1]
+
+    @property
+    def n_sims(self) -> int:
+        return self.data.shape[2]
+
+    @property
+    def T(self) -> int:
+        return self.data.shape[3]
+
+    def metric(self, name: str) -> np.ndarray:
+        """(n_points, n_sims, T) view of one metric"""
+        return self.data[self._slots[name]]
+
+    def points_frame(self) -> pd.DataFrame:
+        """Swept values, one row per point"""
+        return pd.DataFrame(self.points, index=pd.RangeIndex(self.n_points, name='point'))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long table indexed by (point, path, week): swept values, then one column per metric"""
+        index = pd.MultiIndex.from_product(
+            [range(self.n_points), range(self.n_sims), range(self.T)], names=['point', 'path', 'week'])
+        frame = pd.DataFrame({name: self.metric(name).ravel() for name in self.metrics}, index=index)
+        swept = self.points_frame()
+        rows = index.get_level_values('point')
+        for col in reversed(swept.columns):
+            frame.insert(0, col, swept[col].to_numpy()[rows])
+        return frame
+
+def simulate_points(params: SimulationParams, values: Mapping[str, np.ndarray], noise: np.ndarray,
+                    metrics: Sequence[str] = RESULT_FIELDS) -> np.ndarray:
+    """Run k points of one group on shared noise as a single batch: (metrics, k, n_sims, T).
+
+    values holds each swept numeric field as a (k,) array; they are repeated
+    per path and the (n_sims, T, 3) noise block is tiled per point, so point
+    j sees exactly the paths of simulate_batch(replace(params, **point_j)).
+    """
+    k = len(next(iter(values.values()))) if values else 1
+    n = noise.shape[0]
+    batch_params = replace(params, **{name: np.repeat(np.asarray(v, dtype=float), n) for name, v in values.items()})
+    result = simulate_batch(batch_params, None, noise=np.tile(noise, (k, 1, 1)), metrics=metrics)
+    return result.data.reshape(-1, k, n, params.T)
+
+# Per-worker state, set once by the pool initializer
+_worker = {}
+
+def _init_sweep_worker(groups: List[Tuple[SimulationParams, Dict[str, np.ndarray]]], metrics: Tuple[str, ...]):
+    """Pool initializer for run_sweep: each group's params and swept values, sent once"""
+    _worker['groups'] = groups
+    _worker['metrics'] = metrics
+    _worker['noise'] = (None, None)
+
+def run_sweep_chunk(task: Tuple[int, int, int, int, int]):
+    """Wrapper for multiprocessing: paths [start, stop) of points [p0, p1) of one group, as one batch"""
+    g, p0, p1, start, stop = task
+    params, values = _worker['groups'][g]
+    key, noise = _worker['noise']
+    if key != (g, start, stop):
+        # Consecutive tasks mostly share a path range; the block is drawn once
+        noise = draw_random_block(params, path_seeds(params.seed, start, stop))
+        _worker['noise'] = ((g, start, stop), noise)
+    data = simulate_points(params, {name: v[p0:p1] for name, v in values.items()}, noise, _worker['metrics'])
+    if not values:
+        # Points differing only in structural fields: one run serves them all
+        data = np.repeat(data, p1 - p0, axis=1)
+    return g, p0, p1, start, data
+
+def run_sweep(base_params: SimulationParams, sweep: Union[Mapping[str, Sequence[Any]], Sequence[Mapping[str, Any]]],
+              n_sims: int = 200, metrics: Optional[Sequence[str]] = None,
+              chunk_size: Optional[int] = None, processes: Optional[int] = None) -> SweepResult:
+    """Run base_params over every point of a parameter sweep in one pool.
+
+    sweep is a {field: values} grid (expanded with expand_grid) or a list of
+    override dicts. Points are grouped by STRUCTURAL_FIELDS; within a group,
+    many points x paths run as one vectorized simulate_batch call, with
+    numeric overrides given per path. Every point uses paths
+    [0, n_sims) of its seed's stream, so point i matches
+    run_monte_carlo(replace(base_params, **points[i]), n_sims) and points
+    in a group are common-random-numbers runs of each other.
+
+    metrics limits the recorded metrics (default: all of RESULT_FIELDS).
+    The compiled 'jit' backend takes scalar params only, so sweeps always
+    run on the numpy engine.
+    """
+    points = expand_grid(sweep) if isinstance(sweep, Mapping) else [dict(p) for p in sweep]
+    metrics = tuple(metrics) if metrics is not None else RESULT_FIELDS
+    unknown = {name for p in points for name in p} - _PARAM_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown SimulationParams fields: {sorted(unknown)}")
+    missing = set(metrics) - set(RESULT_FIELDS)
+    if missing:
+        raise ValueError(f"Unknown metrics: {sorted(missing)}")
+    if any(p.get('T', base_params.T) != base_params.T for p in points):
+        raise ValueError("Sweep points must share the horizon T of base_params")
+
+    # Group points by their structural overrides
+    members: Dict[tuple, List[int]] = {}
+    for i, p in enumerate(points):
+        key = tuple((name, p[name]) for name in STRUCTURAL_FIELDS if name in p)
+        members.setdefault(key, []).append(i)
+    groups, indices = [], []
+    for key, idx in members.items():
+        numeric = sorted({name for i in idx for name in points[i]} - set(STRUCTURAL_FIELDS))
+        group_params = replace(base_params, **dict(key))
+        values = {name: np.array([points[i].get(name, getattr(base_params, name)) for i in idx], dtype=float)
+                  for name in numeric}
+        groups.append((group_params, values))
+        indices.append(np.array(idx))
+
+    print(f"Starting sweep of {len(points)} points x {n_sims} sims ({len(groups)} groups)...")
+    start_time = time.time()
+
+    processes = processes or cpu_count()
+    if chunk_size is not None or n_sims > _TASK_ROWS:
+        path_chunks = chunk_bounds(n_sims, processes, chunk_size)
+    else:
+        path_chunks = [(0, n_sims)]
+    tasks = []
+    for g, idx in enumerate(indices):
+        for start, stop in path_chunks:
+            # Many points per task, but enough tasks to keep every worker busy
+            per_task = max(1, min(_TASK_ROWS // (stop - start), -(-len(idx) // (2 * processes))))
+            tasks.extend((g, p0, min(len(idx), p0 + per_task), start, stop) for p0 in range(0, len(idx), per_task))
+
+    result = SweepResult(points, metrics, n_sims, base_params.T)
+    with Pool(processes=processes, initializer=_init_sweep_worker, initargs=(groups, metrics)) as pool:
+        for g, p0, p1, start, chunk in pool.imap_unordered(run_sweep_chunk, tasks):
+            result.data[:, indices[g][p0:p1], start:start + chunk.shape[2]] = chunk
+
+    duration = time.time() - start_time
+    print(f"Completed in {duration:.2f} seconds ({len(points) * n_sims / duration:.0f} sims/sec)")
+
+    return result
@@ -0,0 +1,99 @@
+"""
+Engine Parity Verification Script
+Checks that every engine backend reproduces the scalar reference engine
+(engine.simulate_one) path by path, given the same seed streams.
+
+Run: python3 src/research/python/verify_engine_parity.py
+"""
+
+import copy
+import itertools
+import sys
+import numpy as np
+from engine import SimulationParams, RESULT_FIELDS, simulate_one, simulate_batch, path_seeds
+from kernel import simulate_batch_jit, HAS_NUMBA
+
+TOLERANCE = 1e-12  # max relative difference (abs for values below 1)
+N_PATHS = 8
+
+BASE_PARAMS = SimulationParams(
+    T=52,
+    initialSupply=410_000_000,
+    initialPrice=0.10,
+    initialProviders=3200,
+    maxMintWeekly=5_000_000,
+    burnPct=0.65,
+    initialLiquidity=10_000_000,
+    investorUnlockWeek=24,
+    investorSellPct=0.10,
+    demandType='growth',
+    macro='neutral',
+    nSims=N_PATHS,
+    seed=42,
+    providerCostPerWeek=5.0,
+    baseCapacityPerProvider=100.0,
+    kDemandPrice=0.15,
+    kMintPrice=0.10,
+    rewardLagWeeks=4,
+    churnThreshold=10.0,
+    hardwareCost=150.0,
+    competitorYield=0.0,
+    emissionModel='fixed',
+    revenueStrategy='burn'
+)
+
+def scenario_matrix():
+    """One params variant per combination of engine branches"""
+    for demand, macro, emission, strategy, vampire, lag, unlock in itertools.product(
+        ['consistent', 'high-to-decay', 'growth', 'volatile'],
+        ['neutral', 'bullish', 'bearish'],
+        ['fixed', 'kpi'],
+        ['burn', 'reserve'],
+        [0.0, 0.5],
+        [1, 4],
+        [24, 999],
+    ):
+        params = copy.deepcopy(BASE_PARAMS)
+        params.demandType = demand
+        params.macro = macro
+        params.emissionModel = emission
+        params.revenueStrategy = strategy
+        params.competitorYield = vampire
+        params.rewardLagWeeks = lag
+        params.investorUnlockWeek = unlock
+        yield params
+
+def reference_arrays(params: SimulationParams, seeds) -> np.ndarray:
+    """(metrics, n, T) block built from simulate_one rows"""
+    paths = [simulate_one(params, seed) for seed in seeds]
+    return np.array([[[getattr(row, name) for row in path] for path in paths] for name in RESULT_FIELDS])
+
+def max_rel_diff(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.max(np.abs(a - b) / np.maximum(1.0, np.abs(a))))
+
+def run_all_checks() -> bool:
+    backends = {'numpy': simulate_batch, 'jit': simulate_batch_jit}
+    worst = {name: 0.0 for name in backends}
+    n_scenarios = 0
+
+    print("=" * 60)
+    print(f"ENGINE PARITY (numba {'available' if HAS_NUMBA else 'missing: jit runs as plain Python'})")
+    print("=" * 60)
+
+    for params in scenario_matrix():
+        seeds = path_seeds(params.seed, 0, N_PATHS)
+        reference = reference_arrays(params, seeds)
+        for name, engine in backends.items():
+            worst[name] = max(worst[name], max_rel_diff(reference, engine(params, seeds).data))
+        n_scenarios += 1
+
+    ok = True
+    for name, diff in worst.items():
+        passed = diff <= TOLERANCE
+        ok = ok and passed
+        print(f"  {name:6s} vs simulate_one: max rel diff {diff:.2e} over {n_scenarios} scenarios "
+              f"{'✅ PASS' if passed else '❌ FAIL'}")
+    return ok
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_checks() else 1)
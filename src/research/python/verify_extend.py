@@ -0,0 +1,88 @@
+"""
+Run Extension Verification Script
+Checks that extend_monte_carlo / extend_streaming give exactly what a single
+run of the combined size gives, and that they refuse to extend a result of
+other params, another seed, or unknown seed-stream position.
+
+Run: python3 src/research/python/verify_extend.py
+"""
+
+import sys
+import tempfile
+import numpy as np
+from dataclasses import replace
+from engine import BatchResult
+from cache import ResultCache
+from monte_carlo import (run_monte_carlo, extend_monte_carlo, run_monte_carlo_streaming, extend_streaming,
+                         run_monte_carlo_adaptive)
+from verify_engine_parity import BASE_PARAMS
+
+N_FIRST = 150
+N_MORE = 90
+FIRST_PATH = 37
+PROCESSES = 2
+TOLERANCE = 1e-12  # streaming means: merge order changes rounding only
+
+def _report(label: str, passed: bool) -> bool:
+    print(f"  {label:52s} {'✅ PASS' if passed else '❌ FAIL'}")
+    return passed
+
+def _refuses(fn) -> bool:
+    try:
+        fn()
+    except ValueError:
+        return True
+    return False
+
+def run_all_checks() -> bool:
+    params = BASE_PARAMS
+    kwargs = dict(processes=PROCESSES)
+
+    print("=" * 60)
+    print("RUN EXTENSION")
+    print("=" * 60)
+
+    results = {}
+    single = run_monte_carlo(params, N_FIRST + N_MORE, **kwargs)
+    results['extend == single run'] = np.array_equal(
+        extend_monte_carlo(params, run_monte_carlo(params, N_FIRST, **kwargs), N_MORE, **kwargs).data, single.data)
+
+    offset = run_monte_carlo(params, N_FIRST + N_MORE, first_path=FIRST_PATH, **kwargs)
+    extended = extend_monte_carlo(params, run_monte_carlo(params, N_FIRST, first_path=FIRST_PATH, **kwargs), N_MORE, **kwargs)
+    results[f'extend from first_path={FIRST_PATH} == single run'] = (
+        np.array_equal(extended.data, offset.data) and extended.origin == offset.origin)
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = ResultCache(root)
+        first = run_monte_carlo(params, N_FIRST, cache=cache, **kwargs)
+        extend_monte_carlo(params, first, N_MORE, cache=cache, **kwargs)
+        cached = extend_monte_carlo(params, first, N_MORE, cache=cache, **kwargs)
+        results['cached extension == single run'] = np.array_equal(cached.data, single.data)
+
+    streamed = run_monte_carlo_streaming(params, N_FIRST + N_MORE, **kwargs)
+    grown = extend_streaming(params, run_monte_carlo_streaming(params, N_FIRST, **kwargs), N_MORE, **kwargs)
+    results['extend_streaming means == single run'] = grown.n_sims == streamed.n_sims and all(
+        np.allclose(grown.moments[name].mean, streamed.moments[name].mean, rtol=TOLERANCE, atol=0)
+        for name in streamed.moments)
+    adaptive = run_monte_carlo_adaptive(params, rel_tol=1.0, batch_size=N_FIRST, max_sims=N_FIRST, **kwargs).aggregate
+    adaptive = extend_streaming(params, adaptive, N_MORE, **kwargs)
+    results['extend adaptive aggregate == single run'] = adaptive.n_sims == streamed.n_sims and all(
+        np.allclose(adaptive.moments[name].mean, streamed.moments[name].mean, rtol=TOLERANCE, atol=0)
+        for name in streamed.moments)
+
+    previous = run_monte_carlo(params, N_FIRST, **kwargs)
+    results['refuses a run of another seed'] = _refuses(
+        lambda: extend_monte_carlo(replace(params, seed=params.seed + 1), previous, N_MORE, **kwargs))
+    results['refuses a run of other params'] = _refuses(
+        lambda: extend_monte_carlo(replace(params, burnPct=0.3), previous, N_MORE, **kwargs))
+    results['refuses a result of unknown origin'] = _refuses(
+        lambda: extend_monte_carlo(params, BatchResult(N_FIRST, params.T, previous.data), N_MORE, **kwargs))
+    results['refuses an aggregate of another seed'] = _refuses(
+        lambda: extend_streaming(replace(params, seed=params.seed + 1),
+                                 run_monte_carlo_streaming(params, N_FIRST, **kwargs), N_MORE, **kwargs))
+
+    print()
+    return all([_report(label, passed) for label, passed in results.items()])
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_checks() else 1)
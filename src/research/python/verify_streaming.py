@@ -0,0 +1,133 @@
+"""
+Streaming Reduction Verification Script
+Checks QuantileSketch, StreamingAggregator and WeeklyQuantiles against exact
+reductions: quantiles are exact while fewer than k values have been added,
+stay within a rank-error bound once the sketch compacts (also after merges),
+and streaming means match aggregate_results to rounding.
+
+Run: python3 src/research/python/verify_streaming.py
+"""
+
+import sys
+import numpy as np
+from engine import simulate_batch, path_seeds
+from monte_carlo import aggregate_results
+from streaming import QuantileSketch, StreamingAggregator, WeeklyQuantiles, REPORT_SCALE, report_series
+from verify_engine_parity import BASE_PARAMS
+
+K = 64  # small sketches compact often, so the bound is exercised
+RANK_ERROR = 3.0 / K  # KLL rank error is O(1/k); measured worst cases sit near 2/k
+QUANTILES = np.linspace(0.01, 0.99, 99)
+TOLERANCE = 1e-12  # streaming vs exact means: summation order only
+N_ITEMS = 20_000
+N_CHUNKS = 20
+N_PATHS = 4000
+
+def rank_error(estimates: np.ndarray, values: np.ndarray, qs: np.ndarray) -> float:
+    """Worst distance between each target rank q and the rank range of its estimate.
+
+    estimates: (len(qs), T); values: (n, T) exact data.
+    """
+    ordered = np.sort(values, axis=0)
+    worst = 0.0
+    for t in range(values.shape[1]):
+        lo = np.searchsorted(ordered[:, t], estimates[:, t], side='left') / len(ordered)
+        hi = np.searchsorted(ordered[:, t], estimates[:, t], side='right') / len(ordered)
+        worst = max(worst, float(np.max(np.maximum(lo - qs, qs - hi))))
+    return worst
+
+def _report(label: str, passed: bool, detail: str = '') -> bool:
+    print(f"  {label:48s} {detail:>22s} {'✅ PASS' if passed else '❌ FAIL'}")
+    return passed
+
+def check_sketch() -> list:
+    rng = np.random.default_rng(0)
+    T = 3
+    checks = []
+
+    # Below k every item is kept: quantiles equal np.quantile, even across a merge
+    small = rng.lognormal(0, 1, (K, T))
+    sketch = QuantileSketch(T, K, seed=1)
+    sketch.update(small[:K // 2])
+    other = QuantileSketch(T, K, seed=2)
+    other.update(small[K // 2:])
+    sketch.merge(other)
+    checks.append(_report('QuantileSketch exact below k (merged)',
+                          np.array_equal(sketch.quantile(QUANTILES), np.quantile(small, QUANTILES, axis=0))))
+
+    # Above k: batched updates and merges of independently seeded chunks
+    data = rng.lognormal(0, 2, (N_ITEMS, T))
+    streamed = QuantileSketch(T, K, seed=3)
+    for rows in np.array_split(data, N_CHUNKS * 5):
+        streamed.update(rows)
+    error = rank_error(streamed.quantile(QUANTILES), data, QUANTILES)
+    checks.append(_report('QuantileSketch rank error (streamed)', error <= RANK_ERROR,
+                          f"{error:.4f} <= {RANK_ERROR:.4f}"))
+
+    merged = QuantileSketch(T, K, seed=0)
+    for c, rows in enumerate(np.array_split(data, N_CHUNKS)):
+        part = QuantileSketch(T, K, seed=c + 1)
+        part.update(rows)
+        merged.merge(part)
+    error = rank_error(merged.quantile(QUANTILES), data, QUANTILES)
+    checks.append(_report('QuantileSketch rank error (merged chunks)',
+                          error <= RANK_ERROR and merged.count == N_ITEMS, f"{error:.4f} <= {RANK_ERROR:.4f}"))
+    return checks
+
+def check_weekly_quantiles() -> list:
+    params = BASE_PARAMS
+    checks = []
+
+    exact = WeeklyQuantiles('price', params.T, k=K)
+    simulate_batch(params, path_seeds(params.seed, 0, K), metrics=(), reducers=[exact])
+    paths = simulate_batch(params, path_seeds(params.seed, 0, K), metrics=('price',)).metric('price')
+    checks.append(_report('WeeklyQuantiles exact below k',
+                          np.array_equal(exact.quantile(QUANTILES), np.quantile(paths, QUANTILES, axis=0))))
+
+    merged = WeeklyQuantiles('price', params.T, k=K)
+    step = N_PATHS // N_CHUNKS
+    for start in range(0, N_PATHS, step):
+        part = WeeklyQuantiles('price', params.T, k=K)
+        part.reseed(start)
+        simulate_batch(params, path_seeds(params.seed, start, start + step), metrics=(), reducers=[part])
+        merged.merge(part)
+    paths = simulate_batch(params, path_seeds(params.seed, 0, N_PATHS), metrics=('price',)).metric('price')
+    error = rank_error(merged.quantile(QUANTILES), paths, QUANTILES)
+    checks.append(_report('WeeklyQuantiles rank error (merged chunks)', error <= RANK_ERROR,
+                          f"{error:.4f} <= {RANK_ERROR:.4f}"))
+    return checks
+
+def check_aggregator() -> list:
+    params = BASE_PARAMS
+    batch = simulate_batch(params, path_seeds(params.seed, 0, N_PATHS))
+    exact = aggregate_results(batch, params.T)
+
+    agg = StreamingAggregator(params.T, k=K)
+    step = N_PATHS // N_CHUNKS
+    for start in range(0, N_PATHS, step):
+        part = StreamingAggregator(params.T, k=K, seed=start)
+        part.add(simulate_batch(params, path_seeds(params.seed, start, start + step)))
+        agg.merge(part)
+    streamed = agg.result()
+
+    mean_diff = max(float(np.max(np.abs(streamed[name]['mean'] - exact[name]['mean']) /
+                                 np.maximum(1.0, np.abs(exact[name]['mean'])))) for name in REPORT_SCALE)
+    series = report_series(batch)
+    qs = np.array([0.05, 0.95])
+    error = max(rank_error(np.stack([streamed[name]['p05'], streamed[name]['p95']]), series[name] * scale, qs)
+                for name, scale in REPORT_SCALE.items())
+    return [
+        _report('StreamingAggregator means == aggregate_results', mean_diff <= TOLERANCE and agg.n_sims == N_PATHS,
+                f"{mean_diff:.1e} <= {TOLERANCE:.0e}"),
+        _report('StreamingAggregator p05/p95 rank error', error <= RANK_ERROR, f"{error:.4f} <= {RANK_ERROR:.4f}"),
+    ]
+
+def run_all_checks() -> bool:
+    print("=" * 60)
+    print(f"STREAMING REDUCTIONS (k={K})")
+    print("=" * 60)
+    checks = check_sketch() + check_weekly_quantiles() + check_aggregator()
+    return all(checks)
+
+if __name__ == '__main__':
+    sys.exit(0 if run_all_checks() else 1)